@@ -139,7 +139,12 @@ def create_app() -> ConfiguredLockFlask:
 
 		app.config.from_pyfile(config_location)
 
-		sa_engine = sqlalchemy.create_engine(app.config["DATABASE_URI"])
+		# Older configs don't have this key, fall back to SQLAlchemy's default.
+
+		sa_engine = sqlalchemy.create_engine(
+			app.config["DATABASE_URI"],
+			query_cache_size=app.config.get("DATABASE_QUERY_CACHE_SIZE", 500)
+		)
 
 		app.SASession = sqlalchemy.orm.scoped_session(
 			sqlalchemy.orm.sessionmaker(
@@ -1307,8 +1307,8 @@ class Forum(
 	) -> sqlalchemy.sql.Select:
 		"""Generates a selection query with permissions already handled.
 
-		Since forums' permissions may not be parsed, this will always emit
-		additional queries to check.
+		Since forums' permissions may not be parsed, this will always emit an
+		additional query to check, and parse the missing ones.
 
 		:param user: The user whose permissions should be evaluated.
 		:param session: The SQLAlchemy session to execute additional queries with.
@@ -1331,94 +1331,76 @@ class Forum(
 			)
 		)
 
-		first_iteration = True
-		forum_without_parsed_permissions_exists = False
-
-		while (first_iteration or forum_without_parsed_permissions_exists):
-			first_iteration = False
-
-			rows = session.execute(
-				sqlalchemy.select(
-					cls.id,
-					(
-						sqlalchemy.select(ForumParsedPermissions.forum_id).
-						where(inner_conditions).
-						exists()
-					)
-				).
-				where(
-					sqlalchemy.and_(
-						conditions,
-						sqlalchemy.or_(
-							~(
-								sqlalchemy.select(ForumParsedPermissions.forum_id).
-								where(inner_conditions).
-								exists()
-							),
-							(
-								sqlalchemy.select(ForumParsedPermissions.forum_id).
-								where(
-									sqlalchemy.and_(
-										inner_conditions,
-										cls.action_queries["view"](user),
-										sqlalchemy.and_(
-											cls.action_queries[action](user)
-											for action in additional_actions
-										) if additional_actions is not None else True
-									)
-								).
-								exists()
-							)
-						)
-					)
-				).
-				order_by(order_by).
-				limit(limit).
-				offset(offset)
-			).all()
-
-			if len(rows) == 0:
-				# No need to hit the database with a complicated query twice
-				return (
-					# Just in case
-					sqlalchemy.select(cls if not ids_only else cls.id).
-					where(False)
+		# Permissions that haven't been parsed for this user yet have a ``NULL``
+		# ``forum_id`` on the permissions' side of the outer join. All of them are
+		# parsed before paginating, not only the ones within the requested page.
+		# Otherwise, forums skipped by the offset would be counted without their
+		# permissions being known, and the page would change once they are.
+
+		unparsed_permission_forums = session.execute(
+			sqlalchemy.select(cls).
+			outerjoin(
+				ForumParsedPermissions,
+				inner_conditions
+			).
+			where(
+				sqlalchemy.and_(
+					conditions,
+					ForumParsedPermissions.forum_id.is_(None)
 				)
+			)
+		).scalars().all()
 
-			forum_ids = []
-			unparsed_permission_forum_ids = []
-
-			for row in rows:
-				forum_id, parsed_permissions_exist = row
-
-				if not parsed_permissions_exist:
-					forum_without_parsed_permissions_exists = True
-					unparsed_permission_forum_ids.append(forum_id)
-
-					continue
+		if len(unparsed_permission_forums) != 0:
+			for forum in unparsed_permission_forums:
+				forum.reparse_permissions(user)
 
-				forum_ids.append(forum_id)
+			session.commit()
 
-			if forum_without_parsed_permissions_exists:
-				for forum in (
-					session.execute(
-						sqlalchemy.select(cls).
-						where(cls.id.in_(unparsed_permission_forum_ids))
-					).scalars()
-				):
-					forum.reparse_permissions(user)
+		# All permissions exist by now, so they can be joined directly. If parsing
+		# some of them failed, those forums are left out.
 
-				session.commit()
+		forum_ids = session.execute(
+			sqlalchemy.select(cls.id).
+			join(
+				ForumParsedPermissions,
+				inner_conditions
+			).
+			where(
+				sqlalchemy.and_(
+					conditions,
+					cls.action_queries["view"](user),
+					sqlalchemy.and_(
+						cls.action_queries[action](user)
+						for action in additional_actions
+					) if additional_actions is not None else True
+				)
+			).
+			order_by(order_by).
+			limit(limit).
+			offset(offset)
+		).scalars().all()
 
-			if ids_only:
-				return sqlalchemy.select(forum_ids)
+		if len(forum_ids) == 0:
+			# No need to hit the database with a complicated query twice
+			return (
+				# Just in case
+				sqlalchemy.select(cls if not ids_only else cls.id).
+				where(False)
+			)
 
+		if ids_only:
 			return (
-				sqlalchemy.select(cls).
-				where(cls.id.in_(forum_ids)).
-				order_by(order_by)
+				sqlalchemy.select(cls.id).
+				where(cls.id.in_(forum_ids))
 			)
 
+		return (
+			sqlalchemy.select(cls).
+			where(cls.id.in_(forum_ids)).
+			order_by(order_by)
+		)
+
 	def _get_child_forum_and_own_ids(
 		self: Forum,
 		session: sqlalchemy.orm.Session,
@@ -28,6 +28,23 @@ class Message(
 	"""Message model."""
 
 	__tablename__ = "messages"
+	__table_args__ = (
+		sqlalchemy.Index(
+			"ix_messages_sender_id_creation_timestamp",
+			"sender_id",
+			"creation_timestamp"
+		),
+		sqlalchemy.Index(
+			"ix_messages_receiver_id_creation_timestamp",
+			"receiver_id",
+			"creation_timestamp"
+		)
+	)
+	"""Composite indexes used when listing, editing or deleting a user's sent
+	and received messages, which are ordered by their creation timestamp by
+	default. Since B-tree indexes can be scanned backwards, they work for both
+	ascending and descending order.
+	"""
 
 	sender_id = sqlalchemy.Column(
 		UUID,
@@ -22,6 +22,30 @@ class Notification(
 	"""Notification model."""
 
 	__tablename__ = "notifications"
+	__table_args__ = (
+		sqlalchemy.Index(
+			"ix_notifications_user_id_creation_timestamp",
+			"user_id",
+			"creation_timestamp",
+			"id"
+		),
+		sqlalchemy.Index(
+			"ix_notifications_user_id_creation_timestamp_unread",
+			"user_id",
+			"creation_timestamp",
+			"id",
+			postgresql_where=sqlalchemy.column("is_read").is_(False)
+		)
+	)
+	"""Composite indexes used when listing, deleting or confirming that a user's
+	notifications have been read. They're always ordered by their creation
+	timestamp, with their ID used to break ties. Since these indexes also start
+	with the user ID, a separate index for it isn't needed.
+
+	The second index only contains unread notifications, which are usually a
+	small part of all of them. It's used when confirming that notifications have
+	been read, where only unread ones are considered.
+	"""
 
 	user_id = sqlalchemy.Column(
 		UUID,
@@ -30,7 +54,6 @@ class Notification(
 			ondelete="CASCADE",
 			onupdate="CASCADE"
 		),
-		index=True,
 		nullable=False
 	)
 	"""The :attr:`id <.User.id>` of the :class:`.User` who received a
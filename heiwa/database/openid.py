@@ -19,13 +19,20 @@ class OpenIDAuthentication(
 	"""CSRF / replay attack protection model for OpenID authentication."""
 
 	__tablename__ = "openid_authentication"
+	__table_args__ = (
+		sqlalchemy.Index(
+			"ix_openid_authentication_creation_timestamp",
+			"creation_timestamp"
+		),
+	)
+	"""An index used to find expired authentications when cleaning them up."""
 
 	identifier = sqlalchemy.Column(
 		sqlalchemy.String(64),
 		primary_key=True
 	)
 	"""The unique identifier for the user who requested to authenticate.
-	In general, this will be an IP address hashed using SCrypt.
+	In general, this will be an IP address hashed using HMAC-SHA256.
 	"""
 
 	nonce = sqlalchemy.Column(
@@ -83,6 +83,24 @@ class Post(
 	"""Post model."""
 
 	__tablename__ = "posts"
+	__table_args__ = (
+		sqlalchemy.Index(
+			"ix_posts_creation_timestamp",
+			"creation_timestamp",
+			"id"
+		),
+		sqlalchemy.Index(
+			"ix_posts_thread_id_creation_timestamp",
+			"thread_id",
+			"creation_timestamp",
+			"id"
+		)
+	)
+	"""Composite indexes used when listing posts, which are ordered by their
+	creation timestamp by default, with their ID used to break ties. The second
+	one is for posts within a single thread. Since it also starts with the
+	thread ID, a separate index for it isn't needed.
+	"""
 
 	thread_id = sqlalchemy.Column(
 		UUID,
@@ -91,7 +109,6 @@ class Post(
 			ondelete="CASCADE",
 			onupdate="CASCADE"
 		),
-		index=True,
 		nullable=False
 	)
 	"""The :attr:`id <.Thread.id>` of the :class:`.Thread` a post is in."""
@@ -600,7 +617,8 @@ class Post(
 		] = True,
 		order_by: typing.Union[
 			None,
-			sqlalchemy.sql.elements.UnaryExpression
+			sqlalchemy.sql.elements.UnaryExpression,
+			typing.Tuple[sqlalchemy.sql.elements.UnaryExpression, ...]
 		] = None,
 		limit: typing.Union[
 			None,
@@ -615,7 +633,8 @@ class Post(
 		"""Generates a selection query with permissions already handled.
 
 		Since the posts' :class:`.Thread`'s :class:`.Forum`'s permissions may
-		not be parsed, this will always emit additional queries to check.
+		not be parsed, this will always emit an additional query to check, and
+		parse the missing ones.
 
 		:param user: The user whose permissions should be evaluated.
 		:param session: The SQLAlchemy session to execute additional queries with.
@@ -623,7 +642,7 @@ class Post(
 			perform on posts, other than the default ``view`` action.
 		:param conditions: Any additional conditions. :data:`True` by default,
 			meaning there are no conditions.
-		:param order_by: An expression to order by.
+		:param order_by: An expression to order by, or a tuple of them.
 		:param limit: A limit.
 		:param offset: An offset.
 		:param ids_only: Whether or not to only return a query for IDs.
@@ -634,6 +653,9 @@ class Post(
 		from .forum import Forum, ForumParsedPermissions
 		from .thread import Thread
 
+		if not isinstance(order_by, tuple):
+			order_by = (order_by,)
+
 		inner_conditions = (
 			sqlalchemy.and_(
 				ForumParsedPermissions.forum_id == Thread.forum_id,
@@ -641,95 +663,79 @@ class Post(
 			)
 		)
 
-		first_iteration = True
-		post_without_parsed_forum_permissions_exists = False
-
-		while (first_iteration or post_without_parsed_forum_permissions_exists):
-			first_iteration = False
-
-			rows = session.execute(
-				sqlalchemy.select(
-					cls.id,
-					Thread.forum_id,
-					(
-						sqlalchemy.select(ForumParsedPermissions.forum_id).
-						where(inner_conditions).
-						exists()
-					)
-				).
-				where(
-					sqlalchemy.and_(
-						conditions,
-						Thread.id == Post.thread_id,
-						sqlalchemy.or_(
-							~(
-								sqlalchemy.select(ForumParsedPermissions.forum_id).
-								where(inner_conditions).
-								exists()
-							),
-							(
-								sqlalchemy.select(ForumParsedPermissions.forum_id).
-								where(
-									sqlalchemy.and_(
-										inner_conditions,
-										cls.action_queries["view"](user),
-										sqlalchemy.and_(
-											cls.action_queries[action](user)
-											for action in additional_actions
-										) if additional_actions is not None else True
-									)
-								).
-								exists()
-							)
-						)
-					)
-				).
-				order_by(order_by).
-				limit(limit).
-				offset(offset)
-			).all()
-
-			if len(rows) == 0:
-				# No need to hit the database with a complicated query twice
-				return (
-					sqlalchemy.select(cls if not ids_only else cls.id).
-					where(False)
-				)
-
-			post_ids = []
-			unparsed_permission_forum_ids = []
-
-			for row in rows:
-				(
-					post_id,
-					forum_id,
-					parsed_forum_permissions_exist
-				) = row
+		action_conditions = sqlalchemy.and_(
+			cls.action_queries["view"](user),
+			sqlalchemy.and_(
+				cls.action_queries[action](user)
+				for action in additional_actions
+			) if additional_actions is not None else True
+		)
 
-				if not parsed_forum_permissions_exist:
-					post_without_parsed_forum_permissions_exists = True
-					unparsed_permission_forum_ids.append(forum_id)
+		# Forums whose permissions haven't been parsed for this user yet have a
+		# ``NULL`` ``forum_id`` on the permissions' side of the outer join. All of
+		# them are parsed before paginating, not only the ones within the requested
+		# page. Otherwise, posts skipped by the offset would be counted without
+		# their permissions being known, and the page would change once they are.
+		# They're found from the forums themselves, so that this query only grows
+		# with their amount, not with the amount of posts.
+
+		unparsed_permission_forums = session.execute(
+			sqlalchemy.select(Forum).
+			outerjoin(
+				ForumParsedPermissions,
+				sqlalchemy.and_(
+					ForumParsedPermissions.forum_id == Forum.id,
+					ForumParsedPermissions.user_id == user.id
+				)
+			).
+			where(ForumParsedPermissions.forum_id.is_(None))
+		).scalars().all()
 
-					continue
+		if len(unparsed_permission_forums) != 0:
+			for forum in unparsed_permission_forums:
+				forum.reparse_permissions(user)
 
-				post_ids.append(post_id)
+			session.commit()
 
-			if post_without_parsed_forum_permissions_exists:
-				for forum in (
-					session.execute(
-						sqlalchemy.select(Forum).
-						where(Forum.id.in_(unparsed_permission_forum_ids))
-					).scalars()
-				):
-					forum.reparse_permissions(user)
+		# All permissions exist by now, so they can be joined directly. If parsing
+		# some of them failed, those forums' posts are left out.
 
-				session.commit()
+		post_ids = session.execute(
+			sqlalchemy.select(cls.id).
+			join(
+				Thread,
+				Thread.id == cls.thread_id
+			).
+			join(
+				ForumParsedPermissions,
+				inner_conditions
+			).
+			where(
+				sqlalchemy.and_(
+					conditions,
+					action_conditions
+				)
+			).
+			order_by(*order_by).
+			limit(limit).
+			offset(offset)
+		).scalars().all()
 
-			if ids_only:
-				return sqlalchemy.select(post_ids)
+		if len(post_ids) == 0:
+			# No need to hit the database with a complicated query twice
+			return (
+				sqlalchemy.select(cls if not ids_only else cls.id).
+				where(False)
+			)
 
+		if ids_only:
 			return (
-				sqlalchemy.select(cls).
-				where(cls.id.in_(post_ids)).
-				order_by(order_by)
+				sqlalchemy.select(cls.id).
+				where(cls.id.in_(post_ids))
 			)
+
+		return (
+			sqlalchemy.select(cls).
+			where(cls.id.in_(post_ids)).
+			order_by(*order_by)
+		)
@@ -1029,98 +1029,75 @@ class Thread(
 			)
 		)
 
-		first_iteration = True
-		thread_without_parsed_forum_permissions_exists = False
-
-		while (first_iteration or thread_without_parsed_forum_permissions_exists):
-			first_iteration = False
-
-			rows = session.execute(
-				sqlalchemy.select(
-					cls.id,
-					cls.forum_id,
-					(
-						sqlalchemy.select(ForumParsedPermissions.forum_id).
-						where(inner_conditions).
-						exists()
-					)
-				).
-				where(
-					sqlalchemy.and_(
-						conditions,
-						sqlalchemy.or_(
-							~(
-								sqlalchemy.select(ForumParsedPermissions.forum_id).
-								where(inner_conditions).
-								exists()
-							),
-							(
-								sqlalchemy.select(ForumParsedPermissions.forum_id).
-								where(
-									sqlalchemy.and_(
-										inner_conditions,
-										cls.action_queries["view"](user),
-										sqlalchemy.and_(
-											cls.action_queries[action](user)
-											for action in additional_actions
-										) if additional_actions is not None else True
-									)
-								).
-								exists()
-							)
-						)
-					)
-				).
-				order_by(order_by).
-				limit(limit).
-				offset(offset)
-			).all()
-
-			if len(rows) == 0:
-				# No need to hit the database with a complicated query twice
-				return (
-					sqlalchemy.select(cls if not ids_only else cls.id).
-					where(False)
+		# Forums whose permissions haven't been parsed for this user yet have a
+		# ``NULL`` ``forum_id`` on the permissions' side of the outer join. All of
+		# them are parsed before paginating, not only the ones within the requested
+		# page. Otherwise, threads skipped by the offset would be counted without
+		# their permissions being known, and the page would change once they are.
+		# They're found from the forums themselves, so that this query only grows
+		# with their amount, not with the amount of threads.
+
+		unparsed_permission_forums = session.execute(
+			sqlalchemy.select(Forum).
+			outerjoin(
+				ForumParsedPermissions,
+				sqlalchemy.and_(
+					ForumParsedPermissions.forum_id == Forum.id,
+					ForumParsedPermissions.user_id == user.id
 				)
+			).
+			where(ForumParsedPermissions.forum_id.is_(None))
+		).scalars().all()
 
-			thread_ids = []
-			unparsed_permission_forum_ids = []
-
-			for row in rows:
-				(
-					thread_id,
-					forum_id,
-					parsed_permissions_exist
-				) = row
-
-				if not parsed_permissions_exist:
-					thread_without_parsed_forum_permissions_exists = True
-					unparsed_permission_forum_ids.append(forum_id)
-
-					continue
+		if len(unparsed_permission_forums) != 0:
+			for forum in unparsed_permission_forums:
+				forum.reparse_permissions(user)
 
-				thread_ids.append(thread_id)
+			session.commit()
 
-			if thread_without_parsed_forum_permissions_exists:
-				for forum in (
-					session.execute(
-						sqlalchemy.select(Forum).
-						where(Forum.id.in_(unparsed_permission_forum_ids))
-					).scalars()
-				):
-					forum.reparse_permissions(user)
+		# All permissions exist by now, so they can be joined directly. If parsing
+		# some of them failed, those forums' threads are left out.
 
-				session.commit()
+		thread_ids = session.execute(
+			sqlalchemy.select(cls.id).
+			join(
+				ForumParsedPermissions,
+				inner_conditions
+			).
+			where(
+				sqlalchemy.and_(
+					conditions,
+					cls.action_queries["view"](user),
+					sqlalchemy.and_(
+						cls.action_queries[action](user)
+						for action in additional_actions
+					) if additional_actions is not None else True
+				)
+			).
+			order_by(order_by).
+			limit(limit).
+			offset(offset)
+		).scalars().all()
 
-			if ids_only:
-				return sqlalchemy.select(thread_ids)
+		if len(thread_ids) == 0:
+			# No need to hit the database with a complicated query twice
+			return (
+				sqlalchemy.select(cls if not ids_only else cls.id).
+				where(False)
+			)
 
+		if ids_only:
 			return (
-				sqlalchemy.select(cls).
-				where(cls.id.in_(thread_ids)).
-				order_by(order_by)
+				sqlalchemy.select(cls.id).
+				where(cls.id.in_(thread_ids))
 			)
 
+		return (
+			sqlalchemy.select(cls).
+			where(cls.id.in_(thread_ids)).
+			order_by(order_by)
+		)
+
 	def get_subscriber_ids(
 		self: Thread,
 		session: typing.Union[
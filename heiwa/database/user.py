@@ -206,6 +206,20 @@ class User(
 	"""User model."""
 
 	__tablename__ = "users"
+	__table_args__ = (
+		sqlalchemy.Index(
+			"ix_users_registered_by_external_id_creation_timestamp",
+			"registered_by",
+			"external_id",
+			"creation_timestamp"
+		),
+	)
+	"""A composite index used when finding guests by their hashed IP address,
+	cleaning up expired guest accounts, and finding users registered through
+	OpenID by their ``sub``. Since :attr:`external_id <.User.external_id>` is
+	always queried together with :attr:`registered_by <.User.registered_by>`,
+	it doesn't need an index of its own.
+	"""
 
 	registered_by = sqlalchemy.Column(
 		sqlalchemy.String(128),
@@ -223,11 +237,10 @@ class User(
 
 	external_id = sqlalchemy.Column(
 		sqlalchemy.String(64),
-		index=True,
 		nullable=True
 	)
 	"""The service a user was registered by's identifier for them. For guests,
-	this will be a version of their IP address hashed using SCrypt. For users
+	this will be a version of their IP address hashed using HMAC-SHA256. For users
 	registered using OpenID, it will be the ``sub`` key in ``userinfo``.
 
 	.. note::
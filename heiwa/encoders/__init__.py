@@ -16,6 +16,18 @@ import sqlalchemy.orm
 __all__ = ["JSONEncoder"]
 __version__ = "1.3.5"
 
+_EXACT_TYPE_CONVERTERS = {
+	uuid.UUID: str,
+	datetime.datetime: datetime.datetime.isoformat,
+	datetime.date: datetime.date.isoformat,
+	datetime.time: datetime.time.isoformat,
+	bytes: lambda o: base64.b64encode(o).decode("utf-8")
+}
+"""Conversion functions for the most common types in responses, looked up by
+the exact type of an object. This way, values like IDs and timestamps don't
+have to go through every ``isinstance`` check first.
+"""
+
 
 class JSONEncoder(json.JSONEncoder):
 	r"""A JSON encoder based on the default ``JSONEncoder``, modified to add a few
@@ -32,6 +44,8 @@ class JSONEncoder(json.JSONEncoder):
 		                                          are allowed, or don't start with
 		                                          ``'_'`` if there are no permissions
 		                                          set up.
+		SQLAlchemy row mappings                   Dictionaries with all of their
+		                                          columns.
 		``bytes``                                 Base64 encoded strings
 		``date``\ s, ``time``\ s, ``datetime``\ s ISO-8601 strings
 		``Enum``\ s                               Their values
@@ -59,6 +73,11 @@ class JSONEncoder(json.JSONEncoder):
 		`JSONEncoder conversion table`_.
 		"""
 
+		converter = _EXACT_TYPE_CONVERTERS.get(type(o))
+
+		if converter is not None:
+			return converter(o)
+
 		if isinstance(o.__class__, sqlalchemy.orm.DeclarativeMeta):
 			if hasattr(o, "get_allowed_columns"):
 				return {
@@ -72,6 +91,9 @@ class JSONEncoder(json.JSONEncoder):
 				if not column.key.startswith("_")
 			}
 
+		if isinstance(o, sqlalchemy.engine.RowMapping):
+			return dict(o)
+
 		if isinstance(o, bytes):
 			return base64.b64encode(o).decode("utf-8")
 
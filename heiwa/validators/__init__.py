@@ -4,10 +4,11 @@ supports JSON.
 
 from __future__ import annotations
 
-import base64
+import binascii
 import datetime
 import functools
 import re
+import threading
 import typing
 import uuid
 
@@ -20,6 +21,76 @@ from .. import exceptions, types
 __all__ = ["APIValidator", "validate_json"]
 __version__ = "1.10.2"
 
+BASE64_REGEX = re.compile(r"[A-Za-z0-9+/]*={0,2}")
+"""Matches strings made up of only valid base64 characters, in the standard
+alphabet. Used to validate input before it's decoded.
+"""
+
+
+REGEX_CACHE_MAX_LENGTH = 256
+"""The maximum length of regular expressions whose validity is cached. Longer
+patterns are rare, and would let clients fill each worker's memory with
+strings of their choice.
+"""
+
+
+def _is_valid_regex_uncached(value: str) -> bool:
+	"""Checks whether or not ``value`` is a valid regular expression.
+
+	:param value: The regular expression.
+
+	:returns: The result of the check.
+	"""
+
+	try:
+		re.compile(value)
+	except re.error:
+		return False
+
+	return True
+
+
+_is_valid_regex_cached = functools.lru_cache(maxsize=1024)(
+	_is_valid_regex_uncached
+)
+
+
+def _is_valid_regex(value: str) -> bool:
+	"""Checks whether or not ``value`` is a valid regular expression. The
+	:mod:`re` module only caches patterns that compiled successfully, so
+	repeated searches with the same invalid pattern would be compiled every
+	time. Results for patterns up to :data:`.REGEX_CACHE_MAX_LENGTH` characters
+	long are cached here instead.
+
+	:param value: The regular expression.
+
+	:returns: The result of the check.
+	"""
+
+	if len(value) > REGEX_CACHE_MAX_LENGTH:
+		return _is_valid_regex_uncached(value)
+
+	return _is_valid_regex_cached(value)
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_public_url(value: str) -> bool:
+	"""Checks whether or not ``value`` is a valid URL, which corresponds to a
+	public resource. Since the same URLs (like OpenID redirect URIs) tend to be
+	checked over and over again, the results are cached.
+
+	:param value: The URL.
+
+	:returns: The result of the check.
+
+	.. note::
+		The ``validators`` library doesn't raise exceptions for invalid values,
+		it returns a falsy :class:`ValidationFailure <validators.ValidationFailure>`
+		instead.
+	"""
+
+	return bool(validators.url(value, public=True))
+
 
 class APIValidator(cerberus.Validator):
 	"""Cerberus validator for the API."""
@@ -35,9 +106,7 @@ class APIValidator(cerberus.Validator):
 		:param value: The current field's value.
 		"""
 
-		try:
-			re.compile(value)
-		except re.error:
+		if not _is_valid_regex(value):
 			self._error(field, "must be a valid regular expression")
 
 	def _check_with_is_public_url(
@@ -52,9 +121,7 @@ class APIValidator(cerberus.Validator):
 		:param value: The current field's value.
 		"""
 
-		try:
-			validators.url(value, public=True)
-		except validators.ValidationFailure:
+		if not _is_public_url(value):
 			self._error(field, "must be a valid public URL")
 
 	def _check_with_has_no_duplicates(
@@ -84,6 +151,24 @@ class APIValidator(cerberus.Validator):
 
 		return uuid.UUID(value)
 
+	def _normalize_coerce_convert_to_uuid_list(
+		self: APIValidator,
+		value: typing.List[str]
+	) -> typing.List[uuid.UUID]:
+		r"""Converts every item in ``value`` to an :class:`UUID <uuid.UUID>`.
+
+		.. note::
+			For long lists, like those used in ``$in`` searches, coercing the
+			whole list at once is quicker than having Cerberus go through every
+			item's rules separately to coerce them one by one.
+
+		:param value: The current field's value.
+
+		:returns: The converted UUIDs.
+		"""
+
+		return [uuid.UUID(item) for item in value]
+
 	def _normalize_coerce_convert_to_datetime(
 		self: APIValidator,
 		value: str
@@ -109,15 +194,36 @@ class APIValidator(cerberus.Validator):
 	) -> bytes:
 		"""Converts the base64-encoded ``value`` to the bytes it represents.
 
+		.. note::
+			This is the same as :func:`base64.b64decode` with ``validate`` set to
+			:data:`True`, but ``value`` is validated and decoded as it is, without
+			first being copied into a :class:`bytes` object. Some values, like
+			encrypted message content, can be fairly large.
+
 		:param value: The current field's value.
 
 		:returns: The decoded bytes.
 		"""
 
-		return base64.b64decode(
-			value,
-			validate=True
-		)
+		if BASE64_REGEX.fullmatch(value) is None:
+			raise binascii.Error("Non-base64 digit found")
+
+		return binascii.a2b_base64(value)
+
+	def _normalize_coerce_decode_base64_list(
+		self: APIValidator,
+		value: typing.List[str]
+	) -> typing.List[bytes]:
+		"""Converts every base64-encoded item in ``value`` to the bytes it
+		represents. Like with :meth:`_normalize_coerce_convert_to_uuid_list`, this
+		is quicker than coercing each item separately.
+
+		:param value: The current field's value.
+
+		:returns: The decoded bytes.
+		"""
+
+		return [self._normalize_coerce_decode_base64(item) for item in value]
 
 	def _validate_length_divisible_by(
 		self: APIValidator,
@@ -223,6 +329,14 @@ def validate_json(
 	document the validator outputs - in case there were any coercions or other
 	modiciations done by it.
 
+	.. note::
+		Creating a validator means Cerberus has to validate and normalize the
+		schema, which is often more work than validating the document itself.
+		Validators are therefore only created once per thread for every
+		decorated function, and reused afterwards. They aren't shared between
+		threads, since they store the document they're currently processing.
+		The first one is created as soon as the function is decorated.
+
 	:param schema: The cerberus schema.
 
 	:raises heiwa.exceptions.APIJSONMissing: Raised if there is no JSON in the
@@ -240,6 +354,20 @@ def validate_json(
 		[typing.Any],
 		typing.Any
 	]:
+		validators_ = threading.local()
+
+		# Create the first validator right away. Cerberus remembers which schemas
+		# it has already validated for every validator of the same class, so
+		# other threads won't have to do it again once they need their own.
+		# Invalid schemas are also caught when the app is loaded, not on the
+		# first request.
+
+		validators_.validator = APIValidator(
+			schema,
+			*args,
+			**kwargs
+		)
+
 		@functools.wraps(function)
 		def wrapped_function(*w_args, **w_kwargs) -> typing.Any:
 			if flask.request.json is None:
@@ -248,11 +376,14 @@ def validate_json(
 			if not isinstance(flask.request.json, dict):
 				raise exceptions.APIJSONInvalid
 
-			validator = APIValidator(
-				schema,
-				*args,
-				**kwargs
-			)
+			validator = getattr(validators_, "validator", None)
+
+			if validator is None:
+				validator = validators_.validator = APIValidator(
+					schema,
+					*args,
+					**kwargs
+				)
 
 			if not validator.validate(flask.request.json):
 				raise exceptions.APIJSONInvalid(validator.errors)
@@ -1359,17 +1359,17 @@ def view_subscription(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 	)
 
 	return flask.jsonify(
-		flask.g.sa_session.execute(
-			sqlalchemy.select(database.forum_subscribers.c.forum_id).
-			where(
-				sqlalchemy.and_(
-					id_,
-					database.forum_subscribers.c.user_id == flask.g.user.id
+		flask.g.sa_session.scalar(
+			sqlalchemy.select(
+				sqlalchemy.exists().
+				where(
+					sqlalchemy.and_(
+						database.forum_subscribers.c.forum_id == id_,
+						database.forum_subscribers.c.user_id == flask.g.user.id
+					)
 				)
-			).
-			exists().
-			select()
-		).scalars().one()
+			)
+		)
 	), statuses.OK
 
 
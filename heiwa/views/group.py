@@ -253,20 +253,20 @@ def check_if_last_default_group(group_id: uuid.UUID) -> bool:
 	the last group whose ``default_for`` column contains ``'*'``.
 	"""
 
-	return flask.g.sa_session.execute(
-		sqlalchemy.select(database.Group.id).
-		where(
-			sqlalchemy.and_(
-				database.Group.id != group_id,
-				database.Group.default_for.any(
-					"*",
-					operator=operator.eq
+	return flask.g.sa_session.scalar(
+		sqlalchemy.select(
+			sqlalchemy.exists().
+			where(
+				sqlalchemy.and_(
+					database.Group.id != group_id,
+					database.Group.default_for.any(
+						"*",
+						operator=operator.eq
+					)
 				)
 			)
-		).
-		exists().
-		select()
-	).scalars().one()
+		)
+	)
 
 
 @group_blueprint.route("", methods=["POST"])
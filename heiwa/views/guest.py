@@ -5,7 +5,12 @@ import flask
 import sqlalchemy
 
 from .. import database, encoders, exceptions, statuses
-from .utils import generate_jwt, generate_scrypt_hash
+from .utils import (
+	generate_hmac_hash,
+	generate_jwt,
+	is_cleanup_due,
+	reset_cleanup
+)
 
 __all__ = ["guest_blueprint"]
 
@@ -23,100 +28,130 @@ REGISTERED_BY = "guest"
 def token() -> typing.Tuple[flask.Response, int]:
 	"""Returns the access token for a temporary user account. The token expires
 	after the time value provided in seconds within the
-	``'GUEST_SESSION_EXPIRES_AFTER'`` config key. When another user uses this
-	endpoint, all expired guest accounts will also be deleted, provided that
-	they have no public content. (threads, posts, forums)
+	``'GUEST_SESSION_EXPIRES_AFTER'`` config key. At most once every
+	``'GUEST_CLEANUP_INTERVAL'`` seconds, using this endpoint also deletes all
+	expired guest accounts, provided that they have no public content. (threads,
+	posts, forums)
 	"""
 
+	# The config doesn't change once it's been loaded, but it belongs to the
+	# current app, not this module. It's read through the app once per request.
+
+	config = flask.current_app.config
+
+	expires_after = config["GUEST_SESSION_EXPIRES_AFTER"]
+	max_sessions = config["GUEST_MAX_SESSIONS_PER_IP"]
+
 	max_creation_timestamp = (
 		datetime.datetime.now(tz=datetime.timezone.utc)
-		- datetime.timedelta(
-			seconds=flask.current_app.config[
-				"GUEST_SESSION_EXPIRES_AFTER"
-			]
-		)
+		- datetime.timedelta(seconds=expires_after)
 	)
 
-	# Delete all expired sessions with no content
-
-	flask.g.sa_session.execute(
-		sqlalchemy.delete(database.User).
-		where(
-			sqlalchemy.and_(
-				database.User.creation_timestamp <= max_creation_timestamp,
-				database.User.registered_by == REGISTERED_BY,
-				~database.User.has_content
-			)
-		).
-		execution_options(synchronize_session="fetch")
+	hashed_identifier = generate_hmac_hash(
+		flask.g.identifier.encode("utf-8")
 	)
 
-	# Remove external identifier for guests with content that would have been
-	# deleted otherwise
+	# Only whether or not there are at least as many sessions as the limit
+	# matters, so there's no need to count all of them.
 
-	flask.g.sa_session.execute(
-		sqlalchemy.update(database.User).
+	statement = (
+		sqlalchemy.select(database.User.id).
 		where(
 			sqlalchemy.and_(
-				database.User.creation_timestamp <= max_creation_timestamp,
+				database.User.creation_timestamp >= max_creation_timestamp,
 				database.User.registered_by == REGISTERED_BY,
-				database.User.has_content
+				database.User.external_id == hashed_identifier
 			)
 		).
-		values(external_id=None).
-		execution_options(synchronize_session="fetch")
+		limit(max_sessions)
 	)
 
-	# Commit here just in case there is something wrong with user input,
-	# and an exception is raised
+	# Expired sessions are never counted above, so cleaning them up doesn't have
+	# to happen on every request. Only one request per worker process does it,
+	# once the configured interval has passed.
 
-	flask.g.sa_session.commit()
-
-	hashed_identifier = generate_scrypt_hash(
-		flask.g.identifier.encode("utf-8")
+	is_cleaning_up = is_cleanup_due(
+		REGISTERED_BY,
+		config["GUEST_CLEANUP_INTERVAL"]
 	)
 
-	existing_session_count = flask.g.sa_session.execute(
-		sqlalchemy.select(
-			sqlalchemy.func.count(
-				database.User.id
-			)
-		).
-		where(
-			sqlalchemy.and_(
-				database.User.creation_timestamp >= max_creation_timestamp,
-				database.User.registered_by == REGISTERED_BY,
-				database.User.external_id == hashed_identifier
+	if is_cleaning_up:
+		expired_conditions = sqlalchemy.and_(
+			database.User.creation_timestamp <= max_creation_timestamp,
+			database.User.registered_by == REGISTERED_BY
+		)
+
+		# Delete all expired sessions with no content, and remove the external
+		# identifier for guests with content that would have been deleted
+		# otherwise. Both are attached to the session query as CTEs, so
+		# everything is done in a single round trip. Expired guests are never
+		# loaded into the session within this request, so there is no need to
+		# synchronize it, and the user created below always gets a new ID.
+
+		statement = (
+			statement.
+			add_cte(
+				sqlalchemy.delete(database.User).
+				where(
+					sqlalchemy.and_(
+						expired_conditions,
+						~database.User.has_content
+					)
+				).
+				returning(database.User.id).
+				cte("deleted_guests")
+			).
+			add_cte(
+				sqlalchemy.update(database.User).
+				where(
+					sqlalchemy.and_(
+						expired_conditions,
+						database.User.has_content
+					)
+				).
+				values(external_id=None).
+				returning(database.User.id).
+				cte("anonymized_guests")
 			)
 		)
-	).scalars().one()
 
-	print(existing_session_count)
+	try:
+		existing_session_count = len(
+			flask.g.sa_session.execute(statement).scalars().all()
+		)
 
-	if (
-		existing_session_count
-		>= flask.current_app.config["GUEST_MAX_SESSIONS_PER_IP"]
-	):
+		if existing_session_count < max_sessions:
+			user = database.User(
+				registered_by=REGISTERED_BY,
+				external_id=hashed_identifier
+			)
+			user.write(
+				flask.g.sa_session,
+				bypass_first_user_check=True
+			)  # Temporary account, don't make it important
+
+		# Commit the cleanup and the new user together, in a single transaction.
+		# The cleanup is still worth keeping, even if there is no new user.
+
+		flask.g.sa_session.commit()
+	except Exception:
+		# Nothing was cleaned up, let the next request try again
+
+		if is_cleaning_up:
+			reset_cleanup(REGISTERED_BY)
+
+		raise
+
+	if existing_session_count >= max_sessions:
 		# Don't share max session limit, it could theoretically be used to obtain
 		# basic information about other users. Potentially sensitive config
 		# information could also be obtained.
 
 		raise exceptions.APIGuestSessionLimitReached
 
-	user = database.User(
-		registered_by=REGISTERED_BY,
-		external_id=hashed_identifier
-	)
-	user.write(
-		flask.g.sa_session,
-		bypass_first_user_check=True
-	)  # Temporary account, don't make it important
-
-	flask.g.sa_session.commit()
-
 	return flask.jsonify({
 		"token": generate_jwt(
 			user.id,
-			expires_after=flask.current_app.config["GUEST_SESSION_EXPIRES_AFTER"]
+			expires_after=expires_after
 		)
 	}), statuses.CREATED
@@ -3,6 +3,7 @@ import uuid
 
 import flask
 import sqlalchemy
+import sqlalchemy.orm
 
 from .. import (
 	authentication,
@@ -14,9 +15,11 @@ from .. import (
 )
 from .utils import (
 	SEARCH_MAX_IN_LIST_LENGTH,
+	commit_without_expiring,
 	generate_search_schema,
 	generate_search_schema_registry,
 	parse_search,
+	stream_json_list,
 	validate_user_exists
 )
 
@@ -78,6 +81,18 @@ ATTR_SCHEMAS = {
 		"maxlength": 262160  # ~65536 character message with each char being 4 bytes
 	}
 }
+# Shared by every schema where these attributes can be ``null``, instead of each
+# building its own copy
+NULLABLE_ATTR_SCHEMAS = {
+	"edit_timestamp": {
+		**ATTR_SCHEMAS["edit_timestamp"],
+		"nullable": True
+	},
+	"tag": {
+		**ATTR_SCHEMAS["tag"],
+		"nullable": True
+	}
+}
 
 CREATE_EDIT_SCHEMA = {
 	"receiver_id": {
@@ -89,8 +104,7 @@ CREATE_EDIT_SCHEMA = {
 		"required": True
 	},
 	"tag": {
-		**ATTR_SCHEMAS["tag"],
-		"nullable": True,
+		**NULLABLE_ATTR_SCHEMAS["tag"],
 		"required": True
 	},
 	"encrypted_content": {
@@ -107,6 +121,35 @@ SEARCH_SCHEMA = generate_search_schema(
 	default_order_by="creation_timestamp",
 	default_order_asc=False
 )
+LIST_SCHEMA = {
+	**SEARCH_SCHEMA,
+	"after": {
+		**ATTR_SCHEMAS["id"],
+		"dependencies": {
+			# ``edit_timestamp`` can be ``null``, and can't be compared
+			"order.by": [
+				"creation_timestamp",
+				"edit_count"
+			]
+		},
+		"required": False
+	}
+}
+
+# All of the possible orders, built once instead of on every request. Messages
+# can share the same value for the order column, so their IDs are used to break
+# ties and keep the order stable between pages.
+ORDER_CLAUSES = {
+	(by, asc): (
+		order_function(getattr(database.Message, by)),
+		order_function(database.Message.id)
+	)
+	for by in SEARCH_SCHEMA["order"]["schema"]["by"]["allowed"]
+	for asc, order_function in (
+		(True, sqlalchemy.asc),
+		(False, sqlalchemy.desc)
+	)
+}
 
 LT_GT_SEARCH_SCHEMA = {
 	"creation_timestamp": ATTR_SCHEMAS["creation_timestamp"],
@@ -119,19 +162,13 @@ SEARCH_SCHEMA_REGISTRY = generate_search_schema_registry({
 		"schema": {
 			"id": ATTR_SCHEMAS["id"],
 			"creation_timestamp": ATTR_SCHEMAS["creation_timestamp"],
-			"edit_timestamp": {
-				**ATTR_SCHEMAS["edit_timestamp"],
-				"nullable": True
-			},
+			"edit_timestamp": NULLABLE_ATTR_SCHEMAS["edit_timestamp"],
 			"edit_count": ATTR_SCHEMAS["edit_count"],
 			"sender_id": ATTR_SCHEMAS["sender_id"],
 			"receiver_id": ATTR_SCHEMAS["receiver_id"],
 			"is_read": ATTR_SCHEMAS["is_read"],
 			"encrypted_session_key": ATTR_SCHEMAS["encrypted_session_key"],
-			"tag": {
-				**ATTR_SCHEMAS["tag"],
-				"nullable": True
-			},
+			"tag": NULLABLE_ATTR_SCHEMAS["tag"],
 			"encrypted_content": ATTR_SCHEMAS["encrypted_content"]
 		},
 		"maxlength": 1
@@ -161,7 +198,10 @@ SEARCH_SCHEMA_REGISTRY = generate_search_schema_registry({
 		"schema": {
 			"id": {
 				"type": "list",
-				"schema": ATTR_SCHEMAS["id"],
+				"coerce": "convert_to_uuid_list",
+				"schema": {
+					"type": "uuid"
+				},
 				"minlength": 2,
 				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
 			},
@@ -173,10 +213,7 @@ SEARCH_SCHEMA_REGISTRY = generate_search_schema_registry({
 			},
 			"edit_timestamp": {
 				"type": "list",
-				"schema": {
-					**ATTR_SCHEMAS["edit_timestamp"],
-					"nullable": True
-				},
+				"schema": NULLABLE_ATTR_SCHEMAS["edit_timestamp"],
 				"minlength": 2,
 				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
 			},
@@ -188,19 +225,30 @@ SEARCH_SCHEMA_REGISTRY = generate_search_schema_registry({
 			},
 			"sender_id": {
 				"type": "list",
-				"schema": ATTR_SCHEMAS["sender_id"],
+				"coerce": "convert_to_uuid_list",
+				"schema": {
+					"type": "uuid"
+				},
 				"minlength": 2,
 				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
 			},
 			"receiver_id": {
 				"type": "list",
-				"schema": ATTR_SCHEMAS["receiver_id"],
+				"coerce": "convert_to_uuid_list",
+				"schema": {
+					"type": "uuid"
+				},
 				"minlength": 2,
 				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
 			},
 			"encrypted_session_key": {
 				"type": "list",
-				"schema": ATTR_SCHEMAS["encrypted_session_key"],
+				"coerce": "decode_base64_list",
+				"schema": {
+					rule: value
+					for rule, value in ATTR_SCHEMAS["encrypted_session_key"].items()
+					if rule != "coerce"
+				},
 				"minlength": 2,
 				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
 			},
@@ -212,7 +260,12 @@ SEARCH_SCHEMA_REGISTRY = generate_search_schema_registry({
 			},
 			"encrypted_content": {
 				"type": "list",
-				"schema": ATTR_SCHEMAS["encrypted_content"],
+				"coerce": "decode_base64_list",
+				"schema": {
+					rule: value
+					for rule, value in ATTR_SCHEMAS["encrypted_content"].items()
+					if rule != "coerce"
+				},
 				"minlength": 2,
 				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
 			}
@@ -221,6 +274,13 @@ SEARCH_SCHEMA_REGISTRY = generate_search_schema_registry({
 	}
 })
 
+# Shared by all views which need messages sent or received by a certain user.
+# The user's ID must be passed as the ``user_id`` parameter when executing.
+SENDER_OR_RECEIVER_CONDITIONS = sqlalchemy.or_(
+	database.Message.sender_id == sqlalchemy.bindparam("user_id"),
+	database.Message.receiver_id == sqlalchemy.bindparam("user_id")
+)
+
 
 def find_message_by_id(
 	message_id: uuid.UUID,
@@ -230,24 +290,39 @@ def find_message_by_id(
 	"""Finds the message with the given ``message_id``. If it exists, but hasn't
 	been sent or received by the user with the provided ``user_id``,
 	``APIMessageNotFound`` will be raised as if it didn't exist.
+
+	.. note::
+		Messages that have already been found for the same user during the
+		current request are taken from the session's identity map, without
+		querying the database again.
 	"""
 
-	message = session.execute(
-		sqlalchemy.select(database.Message).
-		where(
-			sqlalchemy.and_(
-				database.Message.id == message_id,
-				sqlalchemy.or_(
-					database.Message.sender_id == user_id,
-					database.Message.receiver_id == user_id
+	found_messages = flask.g.setdefault("found_messages", set())
+
+	if (message_id, user_id) in found_messages:
+		message = session.get(database.Message, message_id)
+	else:
+		# The statement is only constructed once, and cached afterwards
+		message = session.execute(
+			sqlalchemy.lambda_stmt(
+				lambda: sqlalchemy.select(database.Message).
+				where(
+					sqlalchemy.and_(
+						database.Message.id == message_id,
+						sqlalchemy.or_(
+							database.Message.sender_id == user_id,
+							database.Message.receiver_id == user_id
+						)
+					)
 				)
 			)
-		)
-	).scalars().one_or_none()
+		).scalars().one_or_none()
 
 	if message is None:
 		raise exceptions.APIMessageNotFound
 
+	found_messages.add((message_id, user_id))
+
 	return message
 
 
@@ -262,23 +337,33 @@ def create() -> typing.Tuple[flask.Response, int]:
 	if flask.g.json["receiver_id"] == flask.g.user.id:
 		raise exceptions.APIMessageCannotSendToSelf
 
-	validate_user_exists(
-		flask.g.json["receiver_id"],
-		flask.g.sa_session,
-		flask.g.user
-	)
+	# Check whether the receiver exists and whether they've blocked the sender
+	# at the same time, in a single round trip.
 
-	if flask.g.sa_session.execute(
-		sqlalchemy.select(database.user_blocks.c.blockee_id).
-		where(
-			sqlalchemy.and_(
-				database.user_blocks.c.blocker_id == flask.g.json["receiver_id"],
-				database.user_blocks.c.blockee_id == flask.g.user.id
-			)
+	receiver_row = flask.g.sa_session.execute(
+		database.User.get(
+			flask.g.user,
+			flask.g.sa_session,
+			conditions=(database.User.id == flask.g.json["receiver_id"]),
+			ids_only=True
 		).
-		exists().
-		select()
-	).scalars().one():
+		add_columns(
+			sqlalchemy.exists().
+			where(
+				sqlalchemy.and_(
+					database.user_blocks.c.blocker_id == database.User.id,
+					database.user_blocks.c.blockee_id == flask.g.user.id
+				)
+			).
+			label("is_sender_blocked")
+		).
+		limit(1)
+	).first()
+
+	if receiver_row is None:
+		raise exceptions.APIUserNotFound(flask.g.json["receiver_id"])
+
+	if receiver_row.is_sender_blocked:
 		raise exceptions.APIMessageReceiverBlockedSender
 
 	message = database.Message.create(
@@ -294,19 +379,19 @@ def create() -> typing.Tuple[flask.Response, int]:
 
 @message_blueprint.route("", methods=["GET"])
 @validators.validate_json(
-	SEARCH_SCHEMA,
+	LIST_SCHEMA,
 	schema_registry=SEARCH_SCHEMA_REGISTRY
 )
 @authentication.authenticate_via_jwt
 def list_() -> typing.Tuple[flask.Response, int]:
 	"""Lists all messages sent or received by ``flask.g.user`` that match the
-	requested filter, if there is one.
+	requested filter, if there is one. If the ``after`` key is given, only
+	messages that come after the message with that ID in the requested order
+	are listed. Unlike large offsets, this doesn't require the database to go
+	through all of the skipped messages first.
 	"""
 
-	conditions = sqlalchemy.or_(
-		database.Message.sender_id == flask.g.user.id,
-		database.Message.receiver_id == flask.g.user.id
-	)
+	conditions = SENDER_OR_RECEIVER_CONDITIONS
 
 	if "filter" in flask.g.json:
 		conditions = sqlalchemy.and_(
@@ -317,24 +402,59 @@ def list_() -> typing.Tuple[flask.Response, int]:
 			)
 		)
 
-	order_column = getattr(
-		database.Message,
-		flask.g.json["order"]["by"]
-	)
+	if "after" in flask.g.json:
+		# Messages can share the same value for the order column, so the ID is
+		# used to break ties.
+
+		order_column = getattr(
+			database.Message,
+			flask.g.json["order"]["by"]
+		)
+
+		cursor = sqlalchemy.tuple_(order_column, database.Message.id)
+		# Only messages the user has sent or received can be used as the cursor.
+		# Otherwise, the response would reveal whether others' messages exist.
+
+		after_cursor = (
+			sqlalchemy.select(order_column, database.Message.id).
+			where(
+				sqlalchemy.and_(
+					database.Message.id == flask.g.json["after"],
+					SENDER_OR_RECEIVER_CONDITIONS
+				)
+			).
+			scalar_subquery()
+		)
+
+		conditions = sqlalchemy.and_(
+			conditions,
+			(
+				cursor > after_cursor
+				if flask.g.json["order"]["asc"]
+				else cursor < after_cursor
+			)
+		)
+
+	# Messages have no relationships, and are encoded using their columns alone.
+	# Make sure that stays true, instead of silently loading something for every
+	# single message while the response is being streamed.
 
 	messages = flask.g.sa_session.execute(
 		sqlalchemy.select(database.Message).
 		where(conditions).
+		options(sqlalchemy.orm.raiseload("*")).
 		order_by(
-			sqlalchemy.asc(order_column)
-			if flask.g.json["order"]["asc"]
-			else sqlalchemy.desc(order_column)
+			*ORDER_CLAUSES[(
+				flask.g.json["order"]["by"],
+				flask.g.json["order"]["asc"]
+			)]
 		).
 		limit(flask.g.json["limit"]).
-		offset(flask.g.json["offset"])
+		offset(flask.g.json["offset"]),
+		{"user_id": flask.g.user.id}
 	).scalars().all()
 
-	return flask.jsonify(messages), statuses.OK
+	return stream_json_list(messages), statuses.OK
 
 
 @message_blueprint.route("", methods=["DELETE"])
@@ -355,10 +475,7 @@ def mass_delete() -> typing.Tuple[flask.Response, int]:
 		able to completely delete messages sent to you could be undesirable.
 	"""
 
-	conditions = sqlalchemy.or_(
-		database.Message.sender_id == flask.g.user.id,
-		database.Message.receiver_id == flask.g.user.id
-	)
+	conditions = SENDER_OR_RECEIVER_CONDITIONS
 
 	if "filter" in flask.g.json:
 		conditions = sqlalchemy.and_(
@@ -369,27 +486,28 @@ def mass_delete() -> typing.Tuple[flask.Response, int]:
 			)
 		)
 
-	order_column = getattr(
-		database.Message,
-		flask.g.json["order"]["by"]
+	target_ids = (
+		sqlalchemy.select(database.Message.id).
+		where(conditions).
+		order_by(
+			*ORDER_CLAUSES[(
+				flask.g.json["order"]["by"],
+				flask.g.json["order"]["asc"]
+			)]
+		).
+		limit(flask.g.json["limit"]).
+		offset(flask.g.json["offset"]).
+		cte("target_ids")
 	)
 
+	# None of the messages have been loaded into the session, there's no need to
+	# fetch and synchronize them.
+
 	flask.g.sa_session.execute(
 		sqlalchemy.delete(database.Message).
-		where(
-			database.Message.id.in_(
-				sqlalchemy.select(database.Message.id).
-				where(conditions).
-				order_by(
-					sqlalchemy.asc(order_column)
-					if flask.g.json["order"]["asc"]
-					else sqlalchemy.desc(order_column)
-				).
-				limit(flask.g.json["limit"]).
-				offset(flask.g.json["offset"])
-			)
-		).
-		execution_options(synchronize_session="fetch")
+		where(database.Message.id == target_ids.c.id).
+		execution_options(synchronize_session=False),
+		{"user_id": flask.g.user.id}
 	)
 
 	flask.g.sa_session.commit()
@@ -418,8 +536,7 @@ def mass_delete() -> typing.Tuple[flask.Response, int]:
 					"required": False
 				},
 				"tag": {
-					**ATTR_SCHEMAS["tag"],
-					"nullable": True,
+					**NULLABLE_ATTR_SCHEMAS["tag"],
 					"required": False
 				},
 				"encrypted_content": {
@@ -471,28 +588,25 @@ def mass_edit() -> typing.Tuple[flask.Response, int]:
 			)
 		)
 
-	order_column = getattr(
-		database.Message,
-		flask.g.json["order"]["by"]
+	target_ids = (
+		sqlalchemy.select(database.Message.id).
+		where(conditions).
+		order_by(
+			*ORDER_CLAUSES[(
+				flask.g.json["order"]["by"],
+				flask.g.json["order"]["asc"]
+			)]
+		).
+		limit(flask.g.json["limit"]).
+		offset(flask.g.json["offset"]).
+		cte("target_ids")
 	)
 
 	flask.g.sa_session.execute(
 		sqlalchemy.update(database.Message).
-		where(
-			database.Message.id.in_(
-				sqlalchemy.select(database.Message.id).
-				where(conditions).
-				order_by(
-					sqlalchemy.asc(order_column)
-					if flask.g.json["order"]["asc"]
-					else sqlalchemy.desc(order_column)
-				).
-				limit(flask.g.json["limit"]).
-				offset(flask.g.json["offset"])
-			)
-		).
+		where(database.Message.id == target_ids.c.id).
 		values(**flask.g.json["values"]).
-		execution_options(synchronize_session="fetch")
+		execution_options(synchronize_session=False)
 	)
 
 	flask.g.sa_session.commit()
@@ -551,19 +665,25 @@ def edit(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 	):
 		raise exceptions.APIMessageCannotChangeIsReadOfSent
 
-	unchanged = True
+	# ``bytes`` comparisons check the length first, and compare the contents
+	# using ``memcmp`` otherwise, so large encrypted content is cheap to compare.
+	# Only the changed columns are part of the ``UPDATE`` emitted when flushing.
 
-	for key, value in flask.g.json.items():
-		if getattr(message, key) != value:
-			unchanged = False
-			setattr(message, key, value)
+	changed_values = {
+		key: value
+		for key, value in flask.g.json.items()
+		if getattr(message, key) != value
+	}
 
-	if unchanged:
+	if len(changed_values) == 0:
 		raise exceptions.APIMessageUnchanged
 
+	for key, value in changed_values.items():
+		setattr(message, key, value)
+
 	message.edited()
 
-	flask.g.sa_session.commit()
+	commit_without_expiring(flask.g.sa_session)
 
 	return flask.jsonify(message), statuses.OK
 
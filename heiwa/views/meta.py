@@ -15,16 +15,44 @@ meta_blueprint = flask.Blueprint(
 meta_blueprint.json_encoder = encoders.JSONEncoder
 
 
+def get_cached_json_response(
+	key: str,
+	get_value: typing.Callable[[], typing.Any]
+) -> flask.Response:
+	"""Returns a JSON response containing the value ``get_value`` returns. Since
+	the meta endpoints only depend on the app's config, which doesn't change once
+	it's been loaded, the value is only encoded once for every app and ``key``.
+
+	:param key: The key to cache the encoded value under.
+	:param get_value: A function which returns the value.
+
+	:returns: The response.
+	"""
+
+	cache = flask.current_app.extensions.setdefault("meta_json_cache", {})
+
+	if key not in cache:
+		cache[key] = flask.json.dumps(get_value()).encode("utf-8")
+
+	return flask.Response(
+		cache[key],
+		mimetype="application/json"
+	)
+
+
 @meta_blueprint.route("/config", methods=["GET"])
 def view_config() -> typing.Tuple[flask.Response, int]:
 	"""Returns basic information about this service's config. Keys which should be
 	shown are defined in the ``'PUBLIC_CONFIG_KEYS'`` key.
 	"""
 
-	return flask.jsonify({
-		value.lower(): flask.current_app.config[value]
-		for value in flask.current_app.config["PUBLIC_CONFIG_KEYS"]
-	}), statuses.OK
+	return get_cached_json_response(
+		"config",
+		lambda: {
+			value.lower(): flask.current_app.config[value]
+			for value in flask.current_app.config["PUBLIC_CONFIG_KEYS"]
+		}
+	), statuses.OK
 
 
 @meta_blueprint.route("/icon", methods=["GET"])
@@ -40,16 +68,19 @@ def view_icon() -> typing.Tuple[flask.Response, int]:
 		"image/png"
 	)
 
-	if not os.path.exists(path):
-		response = flask.jsonify(None)
-	else:
+	# ``send_file`` already looks up the file's size and modification time, and
+	# lets the server handle sending it if ``'USE_X_SENDFILE'`` is enabled. No
+	# need to check whether or not it exists separately.
+
+	try:
 		response = flask.send_file(
 			path,
 			mimetype=mimetype,
 			as_attachment=True,
-			download_name=os.path.basename(path),
-			last_modified=os.path.getmtime(path)
+			download_name=os.path.basename(path)
 		)
+	except FileNotFoundError:
+		response = flask.jsonify(None)
 
 	return response, statuses.OK
 
@@ -60,8 +91,11 @@ def view_info() -> typing.Tuple[flask.Response, int]:
 	certain config keys, looks for all keys beginning with ``'META_'``.
 	"""
 
-	return flask.jsonify({
-		key[5:].lower(): value
-		for key, value in flask.current_app.config.items()
-		if key.startswith("META_")
-	}), statuses.OK
+	return get_cached_json_response(
+		"info",
+		lambda: {
+			key[5:].lower(): value
+			for key, value in flask.current_app.config.items()
+			if key.startswith("META_")
+		}
+	), statuses.OK
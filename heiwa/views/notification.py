@@ -56,11 +56,32 @@ ATTR_SCHEMAS = {
 	}
 }
 
-SEARCH_SCHEMA = generate_search_schema(
-	("creation_timestamp",),
-	default_order_by="creation_timestamp",
-	default_order_asc=False
-)
+SEARCH_SCHEMA = {
+	**generate_search_schema(
+		("creation_timestamp",),
+		default_order_by="creation_timestamp",
+		default_order_asc=False
+	),
+	"after": {
+		**ATTR_SCHEMAS["id"],
+		"required": False
+	}
+}
+
+# All of the possible orders, built once instead of on every request.
+# Notifications can share the same creation timestamp, so their IDs are used to
+# break ties and keep the order stable between pages.
+ORDER_CLAUSES = {
+	(by, asc): (
+		order_function(getattr(database.Notification, by)),
+		order_function(database.Notification.id)
+	)
+	for by in SEARCH_SCHEMA["order"]["schema"]["by"]["allowed"]
+	for asc, order_function in (
+		(True, sqlalchemy.asc),
+		(False, sqlalchemy.desc)
+	)
+}
 
 LT_GT_SEARCH_SCHEMA = {
 	"creation_timestamp": ATTR_SCHEMAS["creation_timestamp"]
@@ -137,6 +158,111 @@ SEARCH_SCHEMA_REGISTRY = generate_search_schema_registry({
 })
 
 
+def get_after_conditions(
+	after_id: uuid.UUID,
+	asc: bool
+) -> sqlalchemy.sql.expression.BinaryExpression:
+	"""Generates conditions which only match notifications that come after the
+	notification with the given ``after_id``, in the order given by ``asc``.
+	Unlike large offsets, this doesn't require the database to go through all
+	of the skipped notifications first. Only ``flask.g.user``'s own notifications
+	can be used to start after, so others' can't be probed for.
+
+	:param after_id: The :attr:`id <heiwa.database.Notification.id>` of the
+		notification to start after.
+	:param asc: Whether or not the notifications are sorted in ascending order.
+
+	:returns: The conditions.
+
+	.. note::
+		Notifications can share the same creation timestamp, so their IDs are
+		used to break ties. Queries using these conditions must also be ordered
+		by the ID.
+	"""
+
+	cursor = sqlalchemy.tuple_(
+		database.Notification.creation_timestamp,
+		database.Notification.id
+	)
+	after_cursor = (
+		sqlalchemy.select(
+			database.Notification.creation_timestamp,
+			database.Notification.id
+		).
+		where(
+			sqlalchemy.and_(
+				database.Notification.id == after_id,
+				database.Notification.user_id == flask.g.user.id
+			)
+		).
+		scalar_subquery()
+	)
+
+	return (
+		cursor > after_cursor
+		if asc
+		else cursor < after_cursor
+	)
+
+
+def build_search_statement(
+	statement: sqlalchemy.sql.Select,
+	conditions: typing.Union[
+		bool,
+		sqlalchemy.sql.expression.BinaryExpression,
+		sqlalchemy.sql.expression.ClauseList
+	] = True
+) -> sqlalchemy.sql.Select:
+	"""Restricts the given ``statement`` to notifications belonging to
+	``flask.g.user`` that match the requested filter and ``after`` cursor, if
+	there are any, and applies the requested order, limit and offset. Shared by
+	all of the endpoints validated using :data:`.SEARCH_SCHEMA`.
+
+	:param statement: The selection statement, e.g. for entire notifications or
+		only their IDs.
+	:param conditions: Any additional conditions. :data:`True` by default,
+		meaning there are no conditions.
+
+	:returns: The statement.
+	"""
+
+	conditions = sqlalchemy.and_(
+		database.Notification.user_id == flask.g.user.id,
+		conditions
+	)
+
+	if "filter" in flask.g.json:
+		conditions = sqlalchemy.and_(
+			conditions,
+			parse_search(
+				flask.g.json["filter"],
+				database.Notification
+			)
+		)
+
+	if "after" in flask.g.json:
+		conditions = sqlalchemy.and_(
+			conditions,
+			get_after_conditions(
+				flask.g.json["after"],
+				flask.g.json["order"]["asc"]
+			)
+		)
+
+	return (
+		statement.
+		where(conditions).
+		order_by(
+			*ORDER_CLAUSES[(
+				flask.g.json["order"]["by"],
+				flask.g.json["order"]["asc"]
+			)]
+		).
+		limit(flask.g.json["limit"]).
+		offset(flask.g.json["offset"])
+	)
+
+
 def find_notification_by_id(
 	notification_id: uuid.UUID,
 	session: sqlalchemy.orm.Session,
@@ -147,17 +273,16 @@ def find_notification_by_id(
 	``APINotificationNotFound`` will be raised as if it didn't exist.
 	"""
 
-	notification = session.execute(
-		sqlalchemy.select(database.Notification).
-		where(
-			sqlalchemy.and_(
-				database.Notification.id == notification_id,
-				database.Notification.user_id == user_id
-			)
-		)
-	).scalars().one_or_none()
+	# Look the notification up by its primary key, which is served from the
+	# session's identity map if it's already been loaded, and check its owner
+	# afterwards.
+
+	notification = session.get(database.Notification, notification_id)
 
-	if notification is None:
+	if (
+		notification is None or
+		notification.user_id != user_id
+	):
 		raise exceptions.APINotificationNotFound
 
 	return notification
@@ -171,36 +296,19 @@ def find_notification_by_id(
 @authentication.authenticate_via_jwt
 def list_() -> typing.Tuple[flask.Response, int]:
 	"""Lists all notifications belonging to ``flask.g.user`` that match the
-	requested filter, if there is one.
+	requested filter, if there is one. If the ``after`` key is given, only
+	notifications that come after the notification with that ID in the
+	requested order are listed.
 	"""
 
-	conditions = (database.Notification.user_id == flask.g.user.id)
-
-	if "filter" in flask.g.json:
-		conditions = sqlalchemy.and_(
-			conditions,
-			parse_search(
-				flask.g.json["filter"],
-				database.Notification
-			)
-		)
-
-	order_column = getattr(
-		database.Notification,
-		flask.g.json["order"]["by"]
-	)
+	# Notifications are only encoded, never modified here. Plain rows are much
+	# cheaper to create than ORM objects, and have the same columns.
 
 	notifications = flask.g.sa_session.execute(
-		sqlalchemy.select(database.Notification).
-		where(conditions).
-		order_by(
-			sqlalchemy.asc(order_column)
-			if flask.g.json["order"]["asc"]
-			else sqlalchemy.desc(order_column)
-		).
-		limit(flask.g.json["limit"]).
-		offset(flask.g.json["offset"])
-	).scalars().all()
+		build_search_statement(
+			sqlalchemy.select(database.Notification.__table__)
+		)
+	).mappings().all()
 
 	return flask.jsonify(notifications), statuses.OK
 
@@ -216,38 +324,17 @@ def mass_delete() -> typing.Tuple[flask.Response, int]:
 	requested filter, if there is one.
 	"""
 
-	conditions = (database.Notification.user_id == flask.g.user.id)
-
-	if "filter" in flask.g.json:
-		conditions = sqlalchemy.and_(
-			conditions,
-			parse_search(
-				flask.g.json["filter"],
-				database.Notification
-			)
-		)
+	target_ids = build_search_statement(
+		sqlalchemy.select(database.Notification.id)
+	).cte("target_ids")
 
-	order_column = getattr(
-		database.Notification,
-		flask.g.json["order"]["by"]
-	)
+	# None of the notifications have been loaded into the session, there's no
+	# need to fetch and synchronize them.
 
 	flask.g.sa_session.execute(
 		sqlalchemy.delete(database.Notification).
-		where(
-			database.Notification.id.in_(
-				sqlalchemy.select(database.Notification.id).
-				where(conditions).
-				order_by(
-					sqlalchemy.asc(order_column)
-					if flask.g.json["order"]["asc"]
-					else sqlalchemy.desc(order_column)
-				).
-				limit(flask.g.json["limit"]).
-				offset(flask.g.json["offset"])
-			)
-		).
-		execution_options(synchronize_session="fetch")
+		where(database.Notification.id == target_ids.c.id).
+		execution_options(synchronize_session=False)
 	)
 
 	flask.g.sa_session.commit()
@@ -266,40 +353,22 @@ def mass_confirm_read() -> typing.Tuple[flask.Response, int]:
 	the requested filter (if there is one) have been read.
 	"""
 
-	conditions = sqlalchemy.and_(
-		database.Notification.user_id == flask.g.user.id,
+	target_ids = build_search_statement(
+		sqlalchemy.select(database.Notification.id),
 		database.Notification.is_read.is_(False)
-	)
+	).cte("target_ids")
 
-	if "filter" in flask.g.json:
-		conditions = sqlalchemy.and_(
-			conditions,
-			parse_search(
-				flask.g.json["filter"],
-				database.Notification
-			)
-		)
+	# Update all of the notifications in a single statement, instead of loading
+	# each one and updating it separately. None of them have been loaded into
+	# the session, so there's nothing to synchronize.
 
-	order_column = getattr(
-		database.Notification,
-		flask.g.json["order"]["by"]
+	flask.g.sa_session.execute(
+		sqlalchemy.update(database.Notification).
+		where(database.Notification.id == target_ids.c.id).
+		values(is_read=True).
+		execution_options(synchronize_session=False)
 	)
 
-	notifications = flask.g.sa_session.execute(
-		sqlalchemy.select(database.Notification).
-		where(conditions).
-		order_by(
-			sqlalchemy.asc(order_column)
-			if flask.g.json["order"]["asc"]
-			else sqlalchemy.desc(order_column)
-		).
-		limit(flask.g.json["limit"]).
-		offset(flask.g.json["offset"])
-	).scalars().all()
-
-	for notification in notifications:
-		notification.is_read = True
-
 	flask.g.sa_session.commit()
 
 	return flask.jsonify({}), statuses.NO_CONTENT
@@ -310,13 +379,20 @@ def mass_confirm_read() -> typing.Tuple[flask.Response, int]:
 def delete(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 	"""Deletes the notification with the requested ``id_``."""
 
-	notification = find_notification_by_id(
-		id_,
-		flask.g.sa_session,
-		flask.g.user.id
-	)
+	# The notification itself isn't needed, so there's no reason to find it
+	# first. If nothing was deleted, it doesn't exist or belongs to someone else.
 
-	notification.delete()
+	if flask.g.sa_session.execute(
+		sqlalchemy.delete(database.Notification).
+		where(
+			sqlalchemy.and_(
+				database.Notification.id == id_,
+				database.Notification.user_id == flask.g.user.id
+			)
+		).
+		execution_options(synchronize_session=False)
+	).rowcount == 0:
+		raise exceptions.APINotificationNotFound
 
 	flask.g.sa_session.commit()
 
@@ -342,12 +418,19 @@ def view(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 def confirm_read(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 	"""Confirms that the notification with the requested ``id_`` has been read."""
 
-	notification = find_notification_by_id(
-		id_,
-		flask.g.sa_session,
-		flask.g.user.id
-	)
+	if flask.g.sa_session.execute(
+		sqlalchemy.update(database.Notification).
+		where(
+			sqlalchemy.and_(
+				database.Notification.id == id_,
+				database.Notification.user_id == flask.g.user.id
+			)
+		).
+		values(is_read=True).
+		execution_options(synchronize_session=False)
+	).rowcount == 0:
+		raise exceptions.APINotificationNotFound
 
-	notification.is_read = True
+	flask.g.sa_session.commit()
 
 	return flask.jsonify({}), statuses.NO_CONTENT
@@ -1,5 +1,11 @@
+from __future__ import annotations
+
+import concurrent.futures
 import datetime
+import functools
 import io
+import logging
+import types
 import typing
 
 import authlib.common.security
@@ -9,10 +15,16 @@ import authlib.oidc.core
 import flask
 import PIL
 import requests
+import requests.adapters
 import sqlalchemy
 
 from .. import database, encoders, exceptions, statuses, validators
-from .utils import generate_jwt, generate_scrypt_hash
+from .utils import (
+	generate_hmac_hash,
+	generate_jwt,
+	is_cleanup_due,
+	reset_cleanup
+)
 
 __all__ = ["openid_blueprint"]
 
@@ -25,8 +37,101 @@ openid_blueprint.json_encoder = encoders.JSONEncoder
 
 REGISTERED_BY = "openid"
 
+AVATAR_REQUEST_TIMEOUT = (3, 5)
+"""The connect and read timeouts for requests to OpenID users' avatars, in
+seconds.
+"""
+AVATAR_CHUNK_SIZE = 8192
+"""The amount of bytes read from avatar responses at once."""
+
+
+class SharedHTTPAdapter(requests.adapters.HTTPAdapter):
+	"""An HTTP adapter meant to be mounted on multiple sessions at once, so that
+	they can reuse each other's connections. Closing a session doesn't close it.
+	"""
+
+	def close(self: SharedHTTPAdapter) -> None:
+		"""Keeps the connection pools open, since other sessions may still be
+		using them.
+		"""
+
+
+_http_adapter = SharedHTTPAdapter(
+	pool_connections=32,
+	pool_maxsize=64
+)
+_revocation_executor = concurrent.futures.ThreadPoolExecutor(
+	max_workers=4,
+	thread_name_prefix="openid_revocation"
+)
+
+
+def get_avatar(url: str) -> typing.Tuple[
+		typing.Union[None, bytes],
+		typing.Union[None, str]
+	]:
+	"""Downloads the avatar at the given ``url``. It's read in chunks, and the
+	download is stopped as soon as it's larger than the ``'USER_MAX_AVATAR_SIZE'``
+	config value, so that large (or endless) responses are never held in memory.
+
+	:param url: The avatar's URL.
+
+	:returns: The avatar and its media type. If it couldn't be downloaded, is too
+		large, isn't a valid image or its type isn't allowed, both are
+		:data:`None`.
+	"""
+
+	config = flask.current_app.config
+
+	avatar = bytearray()
+
+	try:
+		with mount_http_adapter(requests.Session()).get(
+			url,
+			stream=True,
+			timeout=AVATAR_REQUEST_TIMEOUT
+		) as response:
+			for chunk in response.iter_content(AVATAR_CHUNK_SIZE):
+				avatar += chunk
+
+				if len(avatar) > config["USER_MAX_AVATAR_SIZE"]:
+					return None, None
+	except requests.RequestException:
+		return None, None
 
-def get_config(client_name: str) -> typing.Dict[
+	avatar = bytes(avatar)
+
+	try:
+		image = PIL.Image.open(io.BytesIO(avatar))
+		image.verify()
+	except OSError:
+		return None, None
+
+	avatar_type = PIL.Image.MIME[image.format]
+
+	if avatar_type not in config["USER_AVATAR_TYPES"]:
+		return None, None
+
+	return avatar, avatar_type
+
+
+def mount_http_adapter(session: requests.Session) -> requests.Session:
+	"""Mounts the shared HTTP adapter on the given ``session``, so that
+	connections to OpenID services and avatar hosts are kept alive and reused
+	between requests, instead of repeating the TCP and TLS handshakes each time.
+
+	:param session: The session.
+
+	:returns: The same session.
+	"""
+
+	for prefix in ("https://", "http://"):
+		session.mount(prefix, _http_adapter)
+
+	return session
+
+
+def get_config(client_name: str) -> typing.Mapping[
 		str,
 		typing.Dict[
 			str,
@@ -36,16 +141,80 @@ def get_config(client_name: str) -> typing.Dict[
 	"""Returns the current app's config for the OpenID service with the given
 	``client_name``. If the ``'scope'`` parameter is missing or lacks
 	``'openid'``, it's added at the start.
+
+	.. note::
+		The app's config doesn't change once it's been loaded, so every service's
+		config is only built once for every app. A read-only view of it is
+		returned, so that it can't be changed by accident.
 	"""
 
-	config = flask.current_app.config["OPENID_SERVICES"][client_name].copy()
+	cache = flask.current_app.extensions.setdefault("openid_configs", {})
+
+	if client_name not in cache:
+		config = flask.current_app.config["OPENID_SERVICES"][client_name].copy()
 
-	if "scope" not in config:
-		config["scope"] = "openid"
-	elif "openid" not in config["scope"]:
-		config["scope"] = f"openid {config['scope']}"
+		if "scope" not in config:
+			config["scope"] = "openid"
+		elif "openid" not in config["scope"]:
+			config["scope"] = f"openid {config['scope']}"
 
-	return config
+		cache[client_name] = types.MappingProxyType(config)
+
+	return cache[client_name]
+
+
+def revoke_token(
+	config: typing.Mapping[
+		str,
+		typing.Dict[
+			str,
+			str
+		]
+	],
+	access_token: str
+) -> None:
+	"""Revokes the given ``access_token`` using the OpenID service with the given
+	``config``. This is meant to be done in the background, once the user has
+	already received their response, so it opens a new OAuth session.
+
+	:param config: The service's config, as returned by :func:`.get_config`.
+	:param access_token: The access token to revoke.
+	"""
+
+	with mount_http_adapter(
+		authlib.integrations.requests_client.OAuth2Session(
+			**config
+		)
+	) as oa2_session:
+		oa2_session.revoke_token(
+			oa2_session.metadata["token_endpoint"],
+			token=access_token
+		)
+
+
+def log_revocation_failure(
+	logger: logging.Logger,
+	client_name: str,
+	future: concurrent.futures.Future
+) -> None:
+	"""Logs the exception raised by a finished :func:`.revoke_token` call, if
+	there was one. Nothing else waits for its result, so it would be lost
+	otherwise.
+
+	:param logger: The logger to use. Since this runs outside the request's
+		context, it must be passed here.
+	:param client_name: The name of the OpenID service the token belonged to.
+	:param future: The finished revocation.
+	"""
+
+	exception = future.exception()
+
+	if exception is not None:
+		logger.error(
+			"Revoking an access token for %s failed",
+			client_name,
+			exc_info=exception
+		)
 
 
 @openid_blueprint.route("", methods=["GET"])
@@ -86,28 +255,48 @@ def authorize(client_name: str) -> typing.Tuple[flask.Response, int]:
 	if client_name not in flask.current_app.config["OPENID_SERVICES"]:
 		raise exceptions.APIOpenIDServiceNotFound
 
-	# Delete all expired entries
-	flask.g.sa_session.execute(
-		sqlalchemy.delete(database.OpenIDAuthentication).
-		where(
-			database.OpenIDAuthentication.creation_timestamp
-			> (
-				datetime.datetime.now(tz=datetime.timezone.utc)
-				+ datetime.timedelta(seconds=flask.current_app.config[
-					"OPENID_AUTHENTICATION_EXPIRES_AFTER"
-				])
-			)
-		)
+	min_creation_timestamp = (
+		datetime.datetime.now(tz=datetime.timezone.utc)
+		- datetime.timedelta(seconds=flask.current_app.config[
+			"OPENID_AUTHENTICATION_EXPIRES_AFTER"
+		])
 	)
 
+	# Delete all expired entries. This isn't needed for logging in, since expired
+	# entries are never selected below, so only one request per worker process
+	# does it, once the configured interval has passed.
+
+	if is_cleanup_due(
+		REGISTERED_BY,
+		flask.current_app.config["OPENID_CLEANUP_INTERVAL"]
+	):
+		try:
+			flask.g.sa_session.execute(
+				sqlalchemy.delete(database.OpenIDAuthentication).
+				where(
+					database.OpenIDAuthentication.creation_timestamp
+					< min_creation_timestamp
+				)
+			)
+
+			# Keep the cleanup, even if this authentication fails
+			flask.g.sa_session.commit()
+		except Exception:
+			# Nothing was deleted, let the next request try again
+			reset_cleanup(REGISTERED_BY)
+
+			raise
+
 	authentication = flask.g.sa_session.execute(
 		sqlalchemy.select(database.OpenIDAuthentication).
 		where(
 			sqlalchemy.and_(
-				database.OpenIDAuthentication.identifier == generate_scrypt_hash(
+				database.OpenIDAuthentication.identifier == generate_hmac_hash(
 					flask.g.identifier.encode("utf-8")
 				),
-				database.OpenIDAuthentication.state == flask.g.json["state"]
+				database.OpenIDAuthentication.state == flask.g.json["state"],
+				database.OpenIDAuthentication.creation_timestamp
+				>= min_creation_timestamp
 			)
 		)
 	).scalars().one_or_none()
@@ -115,8 +304,10 @@ def authorize(client_name: str) -> typing.Tuple[flask.Response, int]:
 	if authentication is None:
 		raise exceptions.APIOpenIDStateInvalid
 
-	with authlib.integrations.requests_client.OAuth2Session(
-		**get_config(client_name)
+	with mount_http_adapter(
+		authlib.integrations.requests_client.OAuth2Session(
+			**get_config(client_name)
+		)
 	) as oa2_session:
 		try:
 			token = oa2_session.fetch_token(
@@ -152,23 +343,18 @@ def authorize(client_name: str) -> typing.Tuple[flask.Response, int]:
 			)
 		).scalars().one_or_none()
 
-		avatar_url = userinfo.get("picture")
-
-		avatar = None
-		avatar_type = None
+		if user is None:
+			# Existing users keep the avatar they already have, so it's only
+			# downloaded for new ones.
 
-		if avatar_url is not None:
-			try:
-				avatar = requests.get(avatar_url).content
+			avatar_url = userinfo.get("picture")
 
-				image = PIL.Image.open(io.BytesIO(avatar))
-				image.verify()
-			except OSError:
-				avatar = None
+			if avatar_url is not None:
+				avatar, avatar_type = get_avatar(avatar_url)
 			else:
-				avatar_type = PIL.Image.MIME[image.format]
+				avatar = None
+				avatar_type = None
 
-		if user is None:
 			user = database.User.create(
 				flask.g.sa_session,
 				registered_by=REGISTERED_BY,
@@ -187,9 +373,19 @@ def authorize(client_name: str) -> typing.Tuple[flask.Response, int]:
 
 		flask.g.sa_session.commit()
 
-		oa2_session.revoke_token(
-			oa2_session.metadata["token_endpoint"],
-			token=token["access_token"]
+		# The access token isn't needed anymore, but nothing depends on whether
+		# or not revoking it succeeds. Don't make the user wait for it.
+
+		_revocation_executor.submit(
+			revoke_token,
+			get_config(client_name),
+			token["access_token"]
+		).add_done_callback(
+			functools.partial(
+				log_revocation_failure,
+				flask.current_app.logger,
+				client_name
+			)
 		)
 
 		return flask.jsonify({
@@ -216,8 +412,10 @@ def login(client_name: str) -> typing.Tuple[flask.Response, int]:
 	if client_name not in flask.current_app.config["OPENID_SERVICES"]:
 		raise exceptions.APIOpenIDServiceNotFound
 
-	with authlib.integrations.requests_client.OAuth2Session(
-		**get_config(client_name)
+	with mount_http_adapter(
+		authlib.integrations.requests_client.OAuth2Session(
+			**get_config(client_name)
+		)
 	) as oa2_session:
 		nonce = authlib.common.security.generate_token()
 
@@ -227,7 +425,7 @@ def login(client_name: str) -> typing.Tuple[flask.Response, int]:
 			nonce=nonce
 		)
 
-		hashed_identifier = generate_scrypt_hash(
+		hashed_identifier = generate_hmac_hash(
 			flask.g.identifier.encode("utf-8")
 		)
 
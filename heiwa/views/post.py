@@ -1,9 +1,10 @@
+import datetime
 import typing
 import uuid
 
 import flask
 import sqlalchemy
-import sqlalchemy.orm
+import sqlalchemy.dialects.postgresql
 
 from .. import (
 	authentication,
@@ -15,11 +16,14 @@ from .. import (
 )
 from .utils import (
 	SEARCH_MAX_IN_LIST_LENGTH,
+	commit_without_expiring,
+	find_post_by_id,
 	find_thread_by_id,
 	generate_search_schema,
 	generate_search_schema_registry,
 	parse_search,
 	requires_permission,
+	stream_json_list,
 	validate_permission
 )
 
@@ -75,14 +79,61 @@ ATTR_SCHEMAS = {
 	}
 }
 
+# Shared by every schema where these attributes can be ``null``, instead of each
+# building its own copy
+NULLABLE_ATTR_SCHEMAS = {
+	"edit_timestamp": {
+		**ATTR_SCHEMAS["edit_timestamp"],
+		"nullable": True
+	},
+	"subject": {
+		**ATTR_SCHEMAS["subject"],
+		"nullable": True
+	}
+}
+
+
+def _list_of(
+	attr: str,
+	nullable: bool = False
+) -> typing.Dict[
+	str,
+	typing.Union[
+		str,
+		int,
+		typing.Dict[
+			str,
+			typing.Any
+		]
+	]
+]:
+	"""Generates the ``$in`` search schema for the attribute named ``attr``.
+
+	:param attr: The name of the attribute.
+	:param nullable: Whether or not the list's items can be ``null``.
+
+	:returns: The schema.
+	"""
+
+	return {
+		"type": "list",
+		"schema": (
+			NULLABLE_ATTR_SCHEMAS
+			if nullable
+			else ATTR_SCHEMAS
+		)[attr],
+		"minlength": 2,
+		"maxlength": SEARCH_MAX_IN_LIST_LENGTH
+	}
+
+
 CREATE_EDIT_SCHEMA = {
 	"thread_id": {
 		**ATTR_SCHEMAS["thread_id"],
 		"required": True
 	},
 	"subject": {
-		**ATTR_SCHEMAS["subject"],
-		"nullable": True,
+		**NULLABLE_ATTR_SCHEMAS["subject"],
 		"required": True
 	},
 	"content": {
@@ -100,6 +151,27 @@ SEARCH_SCHEMA = generate_search_schema(
 	default_order_by="creation_timestamp",
 	default_order_asc=False
 )
+# The schema only allows these names, so there's no need for a ``getattr``
+# lookup on every request.
+ORDER_COLUMNS = {
+	by: getattr(database.Post, by)
+	for by in SEARCH_SCHEMA["order"]["schema"]["by"]["allowed"]
+}
+LIST_SCHEMA = {
+	**SEARCH_SCHEMA,
+	"after": {
+		**ATTR_SCHEMAS["id"],
+		"dependencies": {
+			# ``edit_timestamp`` can be ``null``, and can't be compared
+			"order.by": [
+				"creation_timestamp",
+				"edit_count",
+				"vote_value"
+			]
+		},
+		"required": False
+	}
+}
 
 LT_GT_SEARCH_SCHEMA = {
 	"creation_timestamp": ATTR_SCHEMAS["creation_timestamp"],
@@ -113,17 +185,11 @@ SEARCH_SCHEMA_REGISTRY = generate_search_schema_registry({
 		"schema": {
 			"id": ATTR_SCHEMAS["id"],
 			"creation_timestamp": ATTR_SCHEMAS["creation_timestamp"],
-			"edit_timestamp": {
-				**ATTR_SCHEMAS["edit_timestamp"],
-				"nullable": True
-			},
+			"edit_timestamp": NULLABLE_ATTR_SCHEMAS["edit_timestamp"],
 			"edit_count": ATTR_SCHEMAS["edit_count"],
 			"thread_id": ATTR_SCHEMAS["thread_id"],
 			"user_id": ATTR_SCHEMAS["user_id"],
-			"subject": {
-				**ATTR_SCHEMAS["subject"],
-				"nullable": True
-			},
+			"subject": NULLABLE_ATTR_SCHEMAS["subject"],
 			"content": ATTR_SCHEMAS["content"],
 			"vote_value": ATTR_SCHEMAS["vote_value"]
 		},
@@ -152,63 +218,15 @@ SEARCH_SCHEMA_REGISTRY = generate_search_schema_registry({
 	"$in": {
 		"type": "dict",
 		"schema": {
-			"id": {
-				"type": "list",
-				"schema": ATTR_SCHEMAS["id"],
-				"minlength": 2,
-				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
-			},
-			"creation_timestamp": {
-				"type": "list",
-				"schema": ATTR_SCHEMAS["creation_timestamp"],
-				"minlength": 2,
-				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
-			},
-			"edit_timestamp": {
-				"type": "list",
-				"schema": {
-					**ATTR_SCHEMAS["edit_timestamp"],
-					"nullable": True
-				},
-				"minlength": 2,
-				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
-			},
-			"edit_count": {
-				"type": "list",
-				"schema": ATTR_SCHEMAS["edit_count"],
-				"minlength": 2,
-				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
-			},
-			"thread_id": {
-				"type": "list",
-				"schema": ATTR_SCHEMAS["thread_id"],
-				"minlength": 2,
-				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
-			},
-			"user_id": {
-				"type": "list",
-				"schema": ATTR_SCHEMAS["user_id"],
-				"minlength": 2,
-				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
-			},
-			"subject": {
-				"type": "list",
-				"schema": ATTR_SCHEMAS["subject"],
-				"minlength": 2,
-				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
-			},
-			"content": {
-				"type": "list",
-				"schema": ATTR_SCHEMAS["content"],
-				"minlength": 2,
-				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
-			},
-			"vote_value": {
-				"type": "list",
-				"schema": ATTR_SCHEMAS["vote_value"],
-				"minlength": 2,
-				"maxlength": SEARCH_MAX_IN_LIST_LENGTH
-			}
+			"id": _list_of("id"),
+			"creation_timestamp": _list_of("creation_timestamp"),
+			"edit_timestamp": _list_of("edit_timestamp", nullable=True),
+			"edit_count": _list_of("edit_count"),
+			"thread_id": _list_of("thread_id"),
+			"user_id": _list_of("user_id"),
+			"subject": _list_of("subject"),
+			"content": _list_of("content"),
+			"vote_value": _list_of("vote_value")
 		},
 		"maxlength": 1
 	},
@@ -229,38 +247,6 @@ SEARCH_SCHEMA_REGISTRY = generate_search_schema_registry({
 })
 
 
-def find_post_by_id(
-	id_: uuid.UUID,
-	session: sqlalchemy.orm.Session,
-	user: database.User
-) -> database.Post:
-	"""Finds the :class:`Post <heiwa.database.Post>` with the given ID.
-
-	:param id_: The :attr:`id <heiwa.database.Post.id>` of the post to find.
-	:param session: The session to find the post with.
-	:param user: The :class:`User <heiwa.database.User>` who must have permission
-		to view the post.
-
-	:raises heiwa.exceptions.APIPostNotFound: Raised when the post doesn't exist,
-		or the user does not have permission to view it.
-
-	:returns: The post.
-	"""
-
-	post = session.execute(
-		database.Post.get(
-			user,
-			session,
-			conditions=(database.Post.id == id_)
-		)
-	).scalars().one_or_none()
-
-	if post is None:
-		raise exceptions.APIPostNotFound
-
-	return post
-
-
 @post_blueprint.route("", methods=["POST"])
 @validators.validate_json(CREATE_EDIT_SCHEMA)
 @authentication.authenticate_via_jwt
@@ -298,7 +284,7 @@ def create() -> typing.Tuple[flask.Response, int]:
 
 @post_blueprint.route("", methods=["GET"])
 @validators.validate_json(
-	SEARCH_SCHEMA,
+	LIST_SCHEMA,
 	schema_registry=SEARCH_SCHEMA_REGISTRY
 )
 @authentication.authenticate_via_jwt
@@ -306,40 +292,88 @@ def create() -> typing.Tuple[flask.Response, int]:
 def list_() -> typing.Tuple[flask.Response, int]:
 	"""Lists all posts that match the requested filter if there is one, and
 	``flask.g.user`` has permission to view. If parsed permissions don't exist
-	for their respective threads' forums, they're automatically calculated.
+	for their respective threads' forums, they're automatically calculated. If
+	the ``after`` key is given, only posts that come after the post with that ID
+	in the requested order are listed. Unlike large offsets, this doesn't
+	require the database to go through all of the skipped posts first.
 	"""
 
-	conditions = True
+	# Every lookup through ``flask.g`` goes through a context-local proxy, only
+	# do it once.
+
+	json_ = flask.g.json
+
+	# There's no need to wrap the parsed filter in another clause, it's already a
+	# single one. ``Post.get`` takes ``True`` as having no conditions at all.
+
+	conditions = (
+		parse_search(
+			json_["filter"],
+			database.Post
+		)
+		if "filter" in json_
+		else True
+	)
+
+	order_column = ORDER_COLUMNS[json_["order"]["by"]]
+	order_function = (
+		sqlalchemy.asc
+		if json_["order"]["asc"]
+		else sqlalchemy.desc
+	)
+
+	if "after" in json_:
+		# The cursor post must be visible too. Otherwise, the response would reveal
+		# whether it exists, and where it's sorted.
+
+		find_post_by_id(
+			json_["after"],
+			flask.g.sa_session,
+			flask.g.user
+		)
+
+		cursor = sqlalchemy.tuple_(order_column, database.Post.id)
+		after_cursor = (
+			sqlalchemy.select(order_column, database.Post.id).
+			where(database.Post.id == json_["after"]).
+			scalar_subquery()
+		)
 
-	if "filter" in flask.g.json:
 		conditions = sqlalchemy.and_(
 			conditions,
-			parse_search(
-				flask.g.json["filter"],
-				database.Post
+			(
+				cursor > after_cursor
+				if json_["order"]["asc"]
+				else cursor < after_cursor
 			)
 		)
 
-	order_column = getattr(
-		database.Post,
-		flask.g.json["order"]["by"]
-	)
+	# Posts are only encoded, never modified here. Plain rows are much cheaper to
+	# create than ORM objects. Since posts have no column-specific view
+	# permissions, selecting every mapped column (including the vote value)
+	# gives the same output. Their content can be up to 64 KiB each, so the
+	# response is streamed instead of being encoded all at once.
 
-	return flask.jsonify(
+	return stream_json_list(
 		flask.g.sa_session.execute(
 			database.Post.get(
 				flask.g.user,
 				flask.g.sa_session,
 				conditions=conditions,
+				# Posts can share the same value for the order column, so their IDs
+				# are used to break ties and keep the order stable between pages.
 				order_by=(
-					sqlalchemy.asc(order_column)
-					if flask.g.json["order"]["asc"]
-					else sqlalchemy.desc(order_column)
+					order_function(order_column),
+					order_function(database.Post.id)
 				),
-				limit=flask.g.json["limit"],
-				offset=flask.g.json["offset"]
-			)
-		).scalars().all()
+				limit=json_["limit"],
+				offset=json_["offset"]
+			).
+			with_only_columns(*(
+				attribute.class_attribute
+				for attribute in sqlalchemy.inspect(database.Post).column_attrs
+			))
+		).mappings().all()
 	), statuses.OK
 
 
@@ -357,53 +391,61 @@ def mass_delete() -> typing.Tuple[flask.Response, int]:
 	calculated.
 	"""
 
-	conditions = True
+	json_ = flask.g.json
 
-	if "filter" in flask.g.json:
-		conditions = sqlalchemy.and_(
-			conditions,
-			parse_search(
-				flask.g.json["filter"],
-				database.Post
-			)
+	conditions = (
+		parse_search(
+			json_["filter"],
+			database.Post
 		)
+		if "filter" in json_
+		else True
+	)
 
-	order_column = getattr(
-		database.Post,
-		flask.g.json["order"]["by"]
+	order_column = ORDER_COLUMNS[json_["order"]["by"]]
+	order_function = (
+		sqlalchemy.asc
+		if json_["order"]["asc"]
+		else sqlalchemy.desc
 	)
 
-	ids = flask.g.sa_session.execute(
-		database.Post.get(
-			flask.g.user,
-			flask.g.sa_session,
-			additional_actions=["delete"],
-			conditions=conditions,
-			order_by=(
-				sqlalchemy.asc(order_column)
-				if flask.g.json["order"]["asc"]
-				else sqlalchemy.desc(order_column)
-			),
-			limit=flask.g.json["limit"],
-			offset=flask.g.json["offset"],
-			ids_only=True
-		)
-	).scalars().all()
+	target_ids = database.Post.get(
+		flask.g.user,
+		flask.g.sa_session,
+		additional_actions=["delete"],
+		conditions=conditions,
+		order_by=order_function(order_column),
+		limit=json_["limit"],
+		offset=json_["offset"],
+		ids_only=True
+	).cte("target_ids")
+
+	# The notifications' deletion is attached to the posts' as a CTE, so both
+	# are done in a single round trip. Neither the notifications nor the posts
+	# have been loaded into the session, there's no need to fetch and synchronize
+	# them.
 
 	flask.g.sa_session.execute(
-		sqlalchemy.delete(database.Notification).
+		sqlalchemy.delete(database.Post).
 		where(
-			sqlalchemy.and_(
-				database.Notification.type.in_(database.Post.NOTIFICATION_TYPES),
-				database.Notification.identifier.in_(ids)
+			database.Post.id.in_(
+				sqlalchemy.select(target_ids.c.id)
 			)
 		).
-		execution_options(synchronize_session="fetch")
-	)
-
-	flask.g.sa_session.execute(
-		sqlalchemy.delete(database.Post).
-		where(database.Post.id.in_(ids))
+		add_cte(
+			sqlalchemy.delete(database.Notification).
+			where(
+				sqlalchemy.and_(
+					database.Notification.type.in_(database.Post.NOTIFICATION_TYPES),
+					database.Notification.identifier.in_(
+						sqlalchemy.select(target_ids.c.id)
+					)
+				)
+			).
+			returning(database.Notification.id).
+			cte("deleted_notifications")
+		).
+		execution_options(synchronize_session=False)
 	)
 
 	flask.g.sa_session.commit()
@@ -424,8 +466,7 @@ def mass_delete() -> typing.Tuple[flask.Response, int]:
 					"required": False
 				},
 				"subject": {
-					**ATTR_SCHEMAS["subject"],
-					"nullable": True,
+					**NULLABLE_ATTR_SCHEMAS["subject"],
 					"required": False
 				},
 				"content": {
@@ -446,14 +487,16 @@ def mass_edit() -> typing.Tuple[flask.Response, int]:
 	forums, they're automatically calculated.
 	"""
 
+	json_ = flask.g.json
+
 	additional_actions = ["edit"]
 
-	if "thread_id" in flask.g.json["values"]:
+	if "thread_id" in json_["values"]:
 		validate_permission(
 			flask.g.user,
 			"move_post_to",
 			find_thread_by_id(
-				flask.g.json["values"]["thread_id"],
+				json_["values"]["thread_id"],
 				flask.g.sa_session,
 				flask.g.user
 			)
@@ -461,52 +504,48 @@ def mass_edit() -> typing.Tuple[flask.Response, int]:
 
 		additional_actions.append("move")
 
-	conditions = (
-		sqlalchemy.select(database.Thread.id).
-		where(
-			sqlalchemy.and_(
-				database.Thread.id == database.Post.thread_id,
-				database.Thread.is_locked.is_(False)
-			)
-		).
-		exists()
-	)
+	# ``Post.get`` already joins each post's thread, there's no need for a
+	# correlated subquery.
 
-	if "filter" in flask.g.json:
+	conditions = database.Thread.is_locked.is_(False)
+
+	if "filter" in json_:
 		conditions = sqlalchemy.and_(
 			conditions,
 			parse_search(
-				flask.g.json["filter"],
-				database.Thread
+				json_["filter"],
+				database.Post
 			)
 		)
 
-	order_column = getattr(
-		database.Thread,
-		flask.g.json["order"]["by"]
+	order_column = ORDER_COLUMNS[json_["order"]["by"]]
+	order_function = (
+		sqlalchemy.asc
+		if json_["order"]["asc"]
+		else sqlalchemy.desc
 	)
 
+	# The posts have not been loaded into the session, there's no need to fetch
+	# and synchronize them.
+
 	flask.g.sa_session.execute(
-		sqlalchemy.update(database.Group).
+		sqlalchemy.update(database.Post).
 		where(
-			database.Group.id.in_(
-				database.Group.get(
+			database.Post.id.in_(
+				database.Post.get(
 					flask.g.user,
 					flask.g.sa_session,
 					additional_actions=additional_actions,
 					conditions=conditions,
-					order_by=(
-						sqlalchemy.asc(order_column)
-						if flask.g.json["order"]["asc"]
-						else sqlalchemy.desc(order_column)
-					),
-					limit=flask.g.json["limit"],
-					offset=flask.g.json["offset"]
+					order_by=order_function(order_column),
+					limit=json_["limit"],
+					offset=json_["offset"],
+					ids_only=True
 				)
 			)
 		).
-		values(**flask.g.json["values"]).
-		execution_options(synchronize_session="fetch")
+		values(**json_["values"]).
+		execution_options(synchronize_session=False)
 	)
 
 	flask.g.sa_session.commit()
@@ -532,10 +571,9 @@ def delete(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 		post
 	)
 
-	if flask.g.sa_session.execute(
-		sqlalchemy.select(database.Thread.is_locked).
-		where(database.Thread.id == post.thread_id)
-	).scalars().one():
+	# The post's thread is loaded along with it, no need for another query
+
+	if post.thread.is_locked:
 		raise exceptions.APIThreadLocked
 
 	post.delete()
@@ -564,23 +602,29 @@ def edit(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 		post
 	)
 
-	if flask.g.sa_session.execute(
-		sqlalchemy.select(database.Thread.is_locked).
-		where(database.Thread.id == post.thread_id)
-	).scalars().one():
+	if post.thread.is_locked:
 		raise exceptions.APIThreadLocked
 
-	unchanged = True
+	# The post has already been loaded to check permissions, so comparing its
+	# values here costs nothing. They're read from the instance's state directly,
+	# without going through every attribute's instrumentation. Only the changed
+	# columns are part of the single ``UPDATE`` emitted when flushing.
+
+	loaded_values = sqlalchemy.inspect(post).dict
 
-	for key, value in flask.g.json.items():
-		if getattr(post, key) != value:
-			unchanged = False
-			setattr(post, key, value)
+	changed_values = {
+		key: value
+		for key, value in flask.g.json.items()
+		if loaded_values[key] != value
+	}
 
-	if unchanged:
+	if len(changed_values) == 0:
 		raise exceptions.APIPostUnchanged
 
-	if post.thread_id != flask.g.json["thread_id"]:
+	# The thread ID must be compared before it's set, otherwise moving posts
+	# would never be validated.
+
+	if "thread_id" in changed_values:
 		future_thread = find_thread_by_id(
 			flask.g.json["thread_id"],
 			flask.g.sa_session,
@@ -600,9 +644,15 @@ def edit(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 
 		post.thread = future_thread
 
+	for key, value in changed_values.items():
+		setattr(post, key, value)
+
 	post.edited()
 
-	flask.g.sa_session.commit()
+	# All of the changed values are set by us. There's no need to load the post
+	# again, only to return it.
+
+	commit_without_expiring(flask.g.sa_session)
 
 	return flask.jsonify(post), statuses.OK
 
@@ -668,47 +718,61 @@ def create_vote(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 		post
 	)
 
-	if flask.g.sa_session.execute(
-		sqlalchemy.select(database.Thread.is_locked).
-		where(database.Thread.id == post.thread_id)
-	).scalars().one():
+	if post.thread.is_locked:
 		raise exceptions.APIThreadLocked
 
-	vote = flask.g.sa_session.execute(
-		sqlalchemy.select(database.PostVote).
-		where(
-			sqlalchemy.and_(
-				database.PostVote.post_id == post.id,
-				database.PostVote.user_id == flask.g.user.id
-			)
-		)
-	).scalars().one_or_none()
-
-	if (
-		vote is not None and
-		vote.upvote is flask.g.json["upvote"]
-	):
-		raise exceptions.APIPostVoteUnchanged
+	# Creating the vote, or updating it if it exists and has a different value,
+	# is done in a single statement. No row is returned if the existing vote is
+	# the same. ``xmax`` is only ``0`` for rows that were just inserted.
 
-	if vote is None:
-		vote = database.PostVote.create(
-			flask.g.sa_session,
+	statement = (
+		sqlalchemy.dialects.postgresql.insert(database.PostVote).
+		values(
 			post_id=post.id,
 			user_id=flask.g.user.id,
 			upvote=flask.g.json["upvote"]
 		)
+	)
 
-		status = statuses.CREATED
-	else:
-		vote.upvote = flask.g.json["upvote"]
-
-		vote.edited()
+	vote = flask.g.sa_session.execute(
+		statement.
+		on_conflict_do_update(
+			index_elements=(
+				database.PostVote.post_id,
+				database.PostVote.user_id
+			),
+			set_={
+				"upvote": statement.excluded.upvote,
+				"edit_timestamp": datetime.datetime.now(tz=datetime.timezone.utc),
+				"edit_count": sqlalchemy.case(
+					(
+						database.PostVote.edit_count < 2147483647,
+						database.PostVote.edit_count + 1
+					),
+					else_=database.PostVote.edit_count
+				)
+			},
+			where=database.PostVote.upvote != statement.excluded.upvote
+		).
+		returning(
+			*database.PostVote.__table__.columns,
+			sqlalchemy.literal_column("xmax = 0").label("is_inserted")
+		)
+	).mappings().first()
 
-		status = statuses.OK
+	if vote is None:
+		raise exceptions.APIPostVoteUnchanged
 
 	flask.g.sa_session.commit()
 
-	return flask.jsonify(vote), status
+	vote = dict(vote)
+	is_inserted = vote.pop("is_inserted")
+
+	return flask.jsonify(vote), (
+		statuses.CREATED
+		if is_inserted
+		else statuses.OK
+	)
 
 
 @post_blueprint.route("/<uuid:id_>/vote", methods=["DELETE"])
@@ -731,27 +795,24 @@ def delete_vote(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 		post
 	)
 
-	if flask.g.sa_session.execute(
-		sqlalchemy.select(database.Thread.is_locked).
-		where(database.Thread.id == post.thread_id)
-	).scalars().one():
+	if post.thread.is_locked:
 		raise exceptions.APIThreadLocked
 
-	existing_vote = flask.g.sa_session.execute(
-		sqlalchemy.select(database.PostVote).
+	# The vote itself isn't needed, so there's no reason to find it first. If
+	# nothing was deleted, it doesn't exist.
+
+	if flask.g.sa_session.execute(
+		sqlalchemy.delete(database.PostVote).
 		where(
 			sqlalchemy.and_(
 				database.PostVote.post_id == post.id,
 				database.PostVote.user_id == flask.g.user.id
 			)
-		)
-	).scalars().one_or_none()
-
-	if existing_vote is None:
+		).
+		execution_options(synchronize_session=False)
+	).rowcount == 0:
 		raise exceptions.APIPostVoteNotFound
 
-	existing_vote.delete()
-
 	flask.g.sa_session.commit()
 
 	return flask.jsonify({}), statuses.NO_CONTENT
@@ -888,17 +888,17 @@ def view_subscription(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 	)
 
 	return flask.jsonify(
-		flask.g.sa_session.execute(
-			sqlalchemy.select(database.thread_subscribers.c.thread_id).
-			where(
-				sqlalchemy.and_(
-					database.thread_subscribers.c.thread_id == id_,
-					database.thread_subscribers.c.user_id == flask.g.user.id
+		flask.g.sa_session.scalar(
+			sqlalchemy.select(
+				sqlalchemy.exists().
+				where(
+					sqlalchemy.and_(
+						database.thread_subscribers.c.thread_id == id_,
+						database.thread_subscribers.c.user_id == flask.g.user.id
+					)
 				)
-			).
-			exists().
-			select()
-		).scalars().one()
+			)
+		)
 	)
 
 
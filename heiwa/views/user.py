@@ -1077,17 +1077,17 @@ def view_block(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 	)
 
 	return flask.jsonify(
-		flask.g.sa_session.execute(
-			sqlalchemy.select(database.user_blocks.c.blocker_id).
-			where(
-				sqlalchemy.and_(
-					database.user_blocks.c.blocker_id == flask.g.user.id,
-					database.user_blocks.c.blockee_id == id_
+		flask.g.sa_session.scalar(
+			sqlalchemy.select(
+				sqlalchemy.exists().
+				where(
+					sqlalchemy.and_(
+						database.user_blocks.c.blocker_id == flask.g.user.id,
+						database.user_blocks.c.blockee_id == id_
+					)
 				)
-			).
-			exists().
-			select()
-		).scalars().one()
+			)
+		)
 	), statuses.OK
 
 
@@ -1324,17 +1324,17 @@ def view_follow(id_: uuid.UUID) -> typing.Tuple[flask.Response, int]:
 	)
 
 	return flask.jsonify(
-		flask.g.sa_session.execute(
-			sqlalchemy.select(database.user_follows.c.follower_id).
-			where(
-				sqlalchemy.and_(
-					database.user_follows.c.follower_id == flask.g.user.id,
-					database.user_follows.c.followee_id == id_
+		flask.g.sa_session.scalar(
+			sqlalchemy.select(
+				sqlalchemy.exists().
+				where(
+					sqlalchemy.and_(
+						database.user_follows.c.follower_id == flask.g.user.id,
+						database.user_follows.c.followee_id == id_
+					)
 				)
-			).
-			exists().
-			select()
-		).scalars().one()
+			)
+		)
 	), statuses.OK
 
 
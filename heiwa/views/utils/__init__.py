@@ -1,9 +1,11 @@
 """Utilities for the API views."""
 
+from .cleanup import is_cleanup_due, reset_cleanup
 from .find_and_validate import (
 	find_category_by_id,
 	find_forum_by_id,
 	find_group_by_id,
+	find_post_by_id,
 	find_thread_by_id,
 	find_user_by_id,
 	validate_category_exists,
@@ -11,11 +13,13 @@ from .find_and_validate import (
 	validate_thread_exists,
 	validate_user_exists
 )
-from .hash import generate_scrypt_hash
+from .hash import generate_hmac_hash
 from .jwt import generate_jwt
 from .permissions import requires_permission, validate_permission
+from .response import stream_json_list
 from .schema import generate_search_schema, generate_search_schema_registry
 from .search import parse_search
+from .session import commit_without_expiring
 from .static import (
 	BASE_PERMISSION_SCHEMA,
 	PERMISSION_KEY_SCHEMA,
@@ -26,17 +30,22 @@ __all__ = [
 	"BASE_PERMISSION_SCHEMA",
 	"PERMISSION_KEY_SCHEMA",
 	"SEARCH_MAX_IN_LIST_LENGTH",
+	"commit_without_expiring",
 	"find_category_by_id",
 	"find_forum_by_id",
 	"find_group_by_id",
+	"find_post_by_id",
 	"find_thread_by_id",
 	"find_user_by_id",
+	"generate_hmac_hash",
 	"generate_jwt",
-	"generate_scrypt_hash",
 	"generate_search_schema",
 	"generate_search_schema_registry",
+	"is_cleanup_due",
 	"parse_search",
 	"requires_permission",
+	"reset_cleanup",
+	"stream_json_list",
 	"validate_permission",
 	"validate_category_exists",
 	"validate_forum_exists",
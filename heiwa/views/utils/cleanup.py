@@ -0,0 +1,47 @@
+import threading
+import time
+import typing
+
+__all__ = ["is_cleanup_due", "reset_cleanup"]
+
+_cleanup_lock = threading.Lock()
+_last_cleanup_timestamps: typing.Dict[str, float] = {}
+
+
+def is_cleanup_due(name: str, interval: int) -> bool:
+	"""Checks whether or not at least ``interval`` seconds have passed since the
+	cleanup with the given ``name`` was last done by this process. If so, the
+	cleanup is marked as done, so that concurrent requests don't repeat it. If
+	it then fails, :func:`.reset_cleanup` must be used.
+
+	:param name: The name of the cleanup, e.g. the blueprint doing it.
+	:param interval: The minimum amount of seconds between cleanups.
+
+	:returns: Whether or not the cleanup should be done.
+	"""
+
+	with _cleanup_lock:
+		current_timestamp = time.monotonic()
+		last_cleanup_timestamp = _last_cleanup_timestamps.get(name)
+
+		if (
+			last_cleanup_timestamp is not None and
+			current_timestamp - last_cleanup_timestamp < interval
+		):
+			return False
+
+		_last_cleanup_timestamps[name] = current_timestamp
+
+		return True
+
+
+def reset_cleanup(name: str) -> None:
+	"""Removes the mark set by :func:`.is_cleanup_due` for the cleanup with the
+	given ``name``, so that the next request tries it again. This is meant to be
+	used when the cleanup was never committed.
+
+	:param name: The name of the cleanup.
+	"""
+
+	with _cleanup_lock:
+		_last_cleanup_timestamps.pop(name, None)
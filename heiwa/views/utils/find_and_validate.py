@@ -1,5 +1,7 @@
+import typing
 import uuid
 
+import flask
 import sqlalchemy.orm
 
 import heiwa.database
@@ -9,6 +11,7 @@ __all__ = [
 	"find_category_by_id",
 	"find_forum_by_id",
 	"find_group_by_id",
+	"find_post_by_id",
 	"find_thread_by_id",
 	"find_user_by_id",
 	"validate_category_exists",
@@ -18,6 +21,238 @@ __all__ = [
 ]
 
 
+def _get_visible_ids(
+	model: typing.Type[heiwa.database.Base],
+	user: heiwa.database.User
+) -> typing.Set[uuid.UUID]:
+	"""Returns the IDs of ``model`` instances that ``user`` has already been
+	confirmed to be allowed to view during the current request. Since the
+	permission checks for forums, threads and posts can take multiple queries,
+	they don't need to be repeated when multiple helpers look up the same
+	object.
+
+	.. note::
+		This is stored in :data:`flask.g`, which is discarded once the request
+		has been handled.
+
+	:param model: The model, e.g. :class:`Forum <heiwa.database.Forum>`.
+	:param user: The user whose permissions were checked.
+
+	:returns: The set of IDs.
+	"""
+
+	return flask.g.setdefault(
+		"visible_ids",
+		{}
+	).setdefault(
+		(model, user.id),
+		set()
+	)
+
+
+def _execute_with_parsed_permissions(
+	statement: sqlalchemy.sql.lambdas.StatementLambdaElement,
+	session: sqlalchemy.orm.Session,
+	user: heiwa.database.User,
+	get_forum: typing.Callable[
+		[heiwa.database.Base],
+		heiwa.database.Forum
+	]
+) -> typing.Union[
+	None,
+	heiwa.database.Base
+]:
+	"""Executes ``statement``, which must start by selecting an object, whether
+	or not ``user`` is allowed to view it, and the relevant
+	:class:`ForumParsedPermissions <heiwa.database.ForumParsedPermissions>`,
+	outer joined. If the parsed permissions are ``NULL``, they don't exist yet.
+	They are then parsed and the statement is executed once more.
+
+	:param statement: The statement.
+	:param session: The session to execute the statement with.
+	:param user: The user whose permissions are being checked.
+	:param get_forum: A function returning the forum whose permissions apply to
+		the selected object.
+
+	:returns: The object, or :data:`None` if it doesn't exist, or ``user`` is not
+		allowed to view it.
+	"""
+
+	row = session.execute(statement).one_or_none()
+
+	if row is not None and row[2] is None:
+		get_forum(row[0]).reparse_permissions(user)
+
+		session.commit()
+
+		row = session.execute(statement).one_or_none()
+
+	if row is None or not row[1]:
+		return None
+
+	return row[0]
+
+
+def _find_visible_forum(
+	id_: uuid.UUID,
+	session: sqlalchemy.orm.Session,
+	user: heiwa.database.User
+) -> typing.Union[
+	None,
+	heiwa.database.Forum
+]:
+	"""Finds the :class:`Forum <heiwa.database.Forum>` with the given ID, as long
+	as ``user`` is allowed to view it. The statement is built through
+	:func:`sqlalchemy.lambda_stmt`, so it's only constructed once and cached
+	afterwards. With parsed permissions present, this takes a single query.
+
+	:param id_: The :attr:`id <heiwa.database.Forum.id>` of the forum to find.
+	:param session: The session to find the forum with.
+	:param user: The :class:`User <heiwa.database.User>` who must have permission
+		to view the forum.
+
+	:returns: The forum, or :data:`None`.
+	"""
+
+	user_id = user.id
+
+	# The view condition is taken from the model itself, so that these lookups
+	# never disagree with its ``get`` method. It's a SQL expression, which the
+	# cached statement tracks like any other element.
+
+	can_view = heiwa.database.Forum.action_queries["view"](user)
+
+	return _execute_with_parsed_permissions(
+		sqlalchemy.lambda_stmt(
+			lambda: sqlalchemy.select(
+				heiwa.database.Forum,
+				can_view,
+				heiwa.database.ForumParsedPermissions
+			).
+			outerjoin(
+				heiwa.database.ForumParsedPermissions,
+				sqlalchemy.and_(
+					heiwa.database.ForumParsedPermissions.forum_id
+					== heiwa.database.Forum.id,
+					heiwa.database.ForumParsedPermissions.user_id == user_id
+				)
+			).
+			where(heiwa.database.Forum.id == id_)
+		),
+		session,
+		user,
+		lambda forum: forum
+	)
+
+
+def _find_visible_thread(
+	id_: uuid.UUID,
+	session: sqlalchemy.orm.Session,
+	user: heiwa.database.User
+) -> typing.Union[
+	None,
+	heiwa.database.Thread
+]:
+	"""Finds the :class:`Thread <heiwa.database.Thread>` with the given ID, as
+	long as ``user`` is allowed to view it. Like with :func:`_find_visible_forum`,
+	the statement is cached.
+
+	:param id_: The :attr:`id <heiwa.database.Thread.id>` of the thread to find.
+	:param session: The session to find the thread with.
+	:param user: The :class:`User <heiwa.database.User>` who must have permission
+		to view the thread.
+
+	:returns: The thread, or :data:`None`.
+	"""
+
+	user_id = user.id
+	can_view = heiwa.database.Thread.action_queries["view"](user)
+
+	return _execute_with_parsed_permissions(
+		sqlalchemy.lambda_stmt(
+			lambda: sqlalchemy.select(
+				heiwa.database.Thread,
+				can_view,
+				heiwa.database.ForumParsedPermissions
+			).
+			outerjoin(
+				heiwa.database.ForumParsedPermissions,
+				sqlalchemy.and_(
+					heiwa.database.ForumParsedPermissions.forum_id
+					== heiwa.database.Thread.forum_id,
+					heiwa.database.ForumParsedPermissions.user_id == user_id
+				)
+			).
+			where(heiwa.database.Thread.id == id_)
+		),
+		session,
+		user,
+		lambda thread: thread.forum
+	)
+
+
+def _find_visible_post(
+	id_: uuid.UUID,
+	session: sqlalchemy.orm.Session,
+	user: heiwa.database.User
+) -> typing.Union[
+	None,
+	heiwa.database.Post
+]:
+	"""Finds the :class:`Post <heiwa.database.Post>` with the given ID, as long as
+	``user`` is allowed to view it. Like with :func:`_find_visible_forum`, the
+	statement is cached.
+
+	The post's thread, forum and the parsed permissions themselves are loaded
+	along with it. Checking any other permissions on the post afterwards then
+	only needs the session's identity map, and doesn't emit more queries.
+
+	:param id_: The :attr:`id <heiwa.database.Post.id>` of the post to find.
+	:param session: The session to find the post with.
+	:param user: The :class:`User <heiwa.database.User>` who must have permission
+		to view the post.
+
+	:returns: The post, or :data:`None`.
+	"""
+
+	user_id = user.id
+	can_view = heiwa.database.Post.action_queries["view"](user)
+
+	return _execute_with_parsed_permissions(
+		sqlalchemy.lambda_stmt(
+			lambda: sqlalchemy.select(
+				heiwa.database.Post,
+				can_view,
+				heiwa.database.ForumParsedPermissions
+			).
+			join(
+				heiwa.database.Thread,
+				heiwa.database.Thread.id == heiwa.database.Post.thread_id
+			).
+			join(
+				heiwa.database.Forum,
+				heiwa.database.Forum.id == heiwa.database.Thread.forum_id
+			).
+			outerjoin(
+				heiwa.database.ForumParsedPermissions,
+				sqlalchemy.and_(
+					heiwa.database.ForumParsedPermissions.forum_id
+					== heiwa.database.Thread.forum_id,
+					heiwa.database.ForumParsedPermissions.user_id == user_id
+				)
+			).
+			where(heiwa.database.Post.id == id_).
+			options(
+				sqlalchemy.orm.contains_eager(heiwa.database.Post.thread),
+				sqlalchemy.orm.contains_eager(heiwa.database.Post.forum)
+			)
+		),
+		session,
+		user,
+		lambda post: post.forum
+	)
+
+
 def find_category_by_id(
 	id_: uuid.UUID,
 	session: sqlalchemy.orm.Session,
@@ -69,17 +304,18 @@ def find_forum_by_id(
 	:returns: The forum.
 	"""
 
-	forum = session.execute(
-		heiwa.database.Forum.get(
-			user,
-			session,
-			conditions=(heiwa.database.Forum.id == id_)
-		)
-	).scalars().one_or_none()
+	visible_ids = _get_visible_ids(heiwa.database.Forum, user)
+
+	if id_ in visible_ids:
+		forum = session.get(heiwa.database.Forum, id_)
+	else:
+		forum = _find_visible_forum(id_, session, user)
 
 	if forum is None:
 		raise heiwa.exceptions.APIForumNotFound
 
+	visible_ids.add(id_)
+
 	return forum
 
 
@@ -115,6 +351,39 @@ def find_group_by_id(
 	return group
 
 
+def find_post_by_id(
+	id_: uuid.UUID,
+	session: sqlalchemy.orm.Session,
+	user: heiwa.database.User
+) -> heiwa.database.Post:
+	"""Finds the :class:`Post <heiwa.database.Post>` with the given ID.
+
+	:param id_: The :attr:`id <heiwa.database.Post.id>` of the post to find.
+	:param session: The session to find the post with.
+	:param user: The :class:`User <heiwa.database.User>` who must have permission
+		to view the post.
+
+	:raises heiwa.exceptions.APIPostNotFound: Raised when the post doesn't exist,
+		or the user does not have permission to view it.
+
+	:returns: The post.
+	"""
+
+	visible_ids = _get_visible_ids(heiwa.database.Post, user)
+
+	if id_ in visible_ids:
+		post = session.get(heiwa.database.Post, id_)
+	else:
+		post = _find_visible_post(id_, session, user)
+
+	if post is None:
+		raise heiwa.exceptions.APIPostNotFound(id_)
+
+	visible_ids.add(id_)
+
+	return post
+
+
 def find_thread_by_id(
 	id_: uuid.UUID,
 	session: sqlalchemy.orm.Session,
@@ -133,17 +402,18 @@ def find_thread_by_id(
 	:returns: The thread.
 	"""
 
-	thread = session.execute(
-		heiwa.database.Thread.get(
-			user,
-			session,
-			conditions=(heiwa.database.Thread.id == id_)
-		)
-	).scalars().one_or_none()
+	visible_ids = _get_visible_ids(heiwa.database.Thread, user)
+
+	if id_ in visible_ids:
+		thread = session.get(heiwa.database.Thread, id_)
+	else:
+		thread = _find_visible_thread(id_, session, user)
 
 	if thread is None:
 		raise heiwa.exceptions.APIThreadNotFound(id_)
 
+	visible_ids.add(id_)
+
 	return thread
 
 
@@ -226,26 +496,22 @@ def validate_forum_exists(
 		exist, or the user does not have permission to view it.
 	"""
 
-	if not session.execute(
-		sqlalchemy.select(
-			heiwa.database.Forum.get(
-				user,
-				session,
-				conditions=(heiwa.database.Forum.id == id_),
-				ids_only=True
-			)
-		).
-		exists().
-		select()
-	).scalars().one():
+	visible_ids = _get_visible_ids(heiwa.database.Forum, user)
+
+	if id_ in visible_ids:
+		return
+
+	if _find_visible_forum(id_, session, user) is None:
 		raise heiwa.exceptions.APIForumNotFound(id_)
 
+	visible_ids.add(id_)
+
 
 def validate_thread_exists(
 	id_: uuid.UUID,
 	session: sqlalchemy.orm.Session,
 	user: heiwa.database.User
-) -> heiwa.database.Thread:
+) -> None:
 	"""Validates that the :class:`Thread <heiwa.database.Thread>` with the given
 	ID exists.
 
@@ -258,19 +524,15 @@ def validate_thread_exists(
 		exist, or the user does not have permission to view it.
 	"""
 
-	if not session.execute(
-		sqlalchemy.select(
-			heiwa.database.Forum.get(
-				user,
-				session,
-				conditions=(heiwa.database.Forum.id == id_),
-				ids_only=True
-			)
-		).
-		exists().
-		select()
-	).scalars().one():
-		raise heiwa.exceptions.APIForumNotFound(id_)
+	visible_ids = _get_visible_ids(heiwa.database.Thread, user)
+
+	if id_ in visible_ids:
+		return
+
+	if _find_visible_thread(id_, session, user) is None:
+		raise heiwa.exceptions.APIThreadNotFound(id_)
+
+	visible_ids.add(id_)
 
 
 def validate_user_exists(
@@ -289,16 +551,16 @@ def validate_user_exists(
 		doesn't exist, or ``user`` lacks the permission to view them.
 	"""
 
-	if not session.execute(
-		sqlalchemy.select(
-			heiwa.database.User.get(
-				user,
-				session,
-				conditions=(heiwa.database.User.id == id_),
-				ids_only=True
-			)
+	# A plain, limited primary key lookup is enough here. Wrapping it in
+	# ``EXISTS`` only adds another layer for the planner to deal with.
+
+	if session.execute(
+		heiwa.database.User.get(
+			user,
+			session,
+			conditions=(heiwa.database.User.id == id_),
+			ids_only=True
 		).
-		exists().
-		select()
-	).scalars().one():
+		limit(1)
+	).scalars().first() is None:
 		raise heiwa.exceptions.APIUserNotFound(id_)
@@ -1,33 +1,28 @@
 import hashlib
+import hmac
 
 import flask
 
+__all__ = ["generate_hmac_hash"]
 
-def generate_scrypt_hash(
-	origin: bytes,
-	dklen: int = 32
-) -> str:
-	"""Generates an SCrypt hash for the given origin, with the current app's
-	secret key as the salt.
+
+def generate_hmac_hash(origin: bytes) -> str:
+	"""Generates an HMAC-SHA256 hash for the given origin, with the current app's
+	secret key as the key.
 
 	:param origin: The original bytes to hash.
-	:param dklen: The length of the resulting hash.
 
 	:returns: The hash.
 
 	.. note::
-		The app's secret key isn't the greatest salt ever, but the best we can
-		afford to use here, since this function is also used for finding values
-		where the salt is already known beforehand. Unfortunately, this means
-		using a random string is out of the question.
+		This is not memory-hard. For values like IP addresses, which are
+		predictable enough that a slow KDF wouldn't stop anyone who knows the
+		secret key anyway, this is far cheaper to run on every request, and still
+		can't be reversed without the key.
 	"""
 
-	return hashlib.scrypt(
+	return hmac.new(
+		flask.current_app.config["SECRET_KEY"].encode("utf-8"),
 		origin,
-		salt=flask.current_app.config["SECRET_KEY"].encode("utf-8"),
-		n=flask.current_app.config["SCRYPT_N"],
-		r=flask.current_app.config["SCRYPT_R"],
-		p=flask.current_app.config["SCRYPT_P"],
-		maxmem=flask.current_app.config["SCRYPT_MAXMEM"],
-		dklen=dklen
-	).hex()
+		hashlib.sha256
+	).hexdigest()
@@ -1,4 +1,5 @@
 import datetime
+import functools
 import uuid
 
 import authlib.jose
@@ -6,38 +7,67 @@ import flask
 
 __all__ = ["generate_jwt"]
 
+ISSUED_AT_PRECISION = 60
+"""The number of seconds JWTs' ``iat`` claims are rounded down to. Tokens for
+the same user generated within this window are identical, so they're only
+signed once.
+"""
 
-def generate_jwt(
+
+@functools.lru_cache(maxsize=1024)
+def _cached_jwt(
 	user_id: uuid.UUID,
-	name: str = None,
-	expires_after: int = None
+	issuer: str,
+	issued_at: int,
+	expires_after: int,
+	secret_key: str
 ) -> str:
-	"""Creates a JWT for the user with the given ``user_id``."""
-
-	current_timestamp = round(
-		datetime.datetime.now(tz=datetime.timezone.utc).timestamp()
-	)
+	"""Signs a JWT with the given claims. Since the result only depends on the
+	arguments, it's cached.
+	"""
 
 	return authlib.jose.jwt.encode(
 		{
 			"alg": "HS256"
 		},
 		{
-			"iss": (
-				flask.current_app.config["META_NAME"]
-				if name is None
-				else name
-			),
-			"iat": current_timestamp,
-			"exp": (
-				current_timestamp
-				+ (
-					flask.current_app.config["JWT_EXPIRES_AFTER"]
-					if expires_after is None
-					else expires_after
-				)
-			),
+			"iss": issuer,
+			"iat": issued_at,
+			"exp": issued_at + expires_after,
 			"sub": str(user_id)
 		},
-		flask.current_app.config["SECRET_KEY"]
+		secret_key
 	).decode("utf-8")
+
+
+def generate_jwt(
+	user_id: uuid.UUID,
+	name: str = None,
+	expires_after: int = None
+) -> str:
+	"""Creates a JWT for the user with the given ``user_id``.
+
+	.. note::
+		The ``iat`` claim is rounded down to :data:`.ISSUED_AT_PRECISION`, which
+		means tokens may expire up to that many seconds earlier than they would
+		otherwise. In return, repeated requests for the same user reuse the
+		already signed token.
+	"""
+
+	config = flask.current_app.config
+
+	current_timestamp = round(
+		datetime.datetime.now(tz=datetime.timezone.utc).timestamp()
+	)
+
+	return _cached_jwt(
+		user_id,
+		config["META_NAME"] if name is None else name,
+		current_timestamp - current_timestamp % ISSUED_AT_PRECISION,
+		(
+			config["JWT_EXPIRES_AFTER"]
+			if expires_after is None
+			else expires_after
+		),
+		config["SECRET_KEY"]
+	)
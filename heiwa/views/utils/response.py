@@ -0,0 +1,42 @@
+import typing
+
+import flask
+
+import heiwa.encoders
+
+__all__ = ["stream_json_list"]
+
+
+def stream_json_list(items: typing.Iterable[typing.Any]) -> flask.Response:
+	r"""Creates a response containing ``items`` as a JSON list, which is encoded
+	and sent one item at a time. Unlike :func:`flask.jsonify`, this never holds
+	the entire encoded body in memory at once, which can be fairly large for
+	objects with binary content, like :class:`Message <heiwa.database.Message>`\ s.
+
+	:param items: The items to encode.
+
+	:returns: The response.
+
+	.. note::
+		The request context is kept for as long as the response is being
+		streamed, so objects can still access ``flask.g.user`` and the session
+		while they're encoded.
+	"""
+
+	encoder = heiwa.encoders.JSONEncoder()
+
+	def generate() -> typing.Iterator[str]:
+		yield "["
+
+		for index, item in enumerate(items):
+			if index != 0:
+				yield ","
+
+			yield encoder.encode(item)
+
+		yield "]"
+
+	return flask.Response(
+		flask.stream_with_context(generate()),
+		mimetype="application/json"
+	)
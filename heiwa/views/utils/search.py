@@ -1,23 +1,127 @@
+import functools
+import operator
 import typing
 
 import sqlalchemy
 import sqlalchemy.orm
 
 import heiwa.database
+import heiwa.exceptions
 
 __all__ = ["parse_search"]
 
 
+def _in(attr, value) -> sqlalchemy.sql.expression.BinaryExpression:
+	"""Returns a condition for whether or not ``attr`` is in ``value``."""
+
+	return attr.in_(value)
+
+
+REGEX_SPECIAL_CHARACTERS = frozenset("\\.^$*+?()[]{}|")
+"""Characters with a special meaning in regular expressions. Patterns without
+any of them only match themselves.
+"""
+
+
+def _regexp_match(attr, value) -> sqlalchemy.sql.expression.BinaryExpression:
+	"""Returns a condition for whether or not ``attr`` matches the regular
+	expression ``value``.
+
+	.. note::
+		Patterns which are plain substrings are searched for using ``LIKE``
+		instead. It finds the same rows without going through the regular
+		expression engine, and can use trigram indexes where they exist.
+	"""
+
+	if REGEX_SPECIAL_CHARACTERS.isdisjoint(value):
+		return attr.contains(value, autoescape=True)
+
+	return attr.regexp_match(value)
+
+
 OPERATORS = {
-	"$eq": lambda attr, value: attr == value,
-	"$lt": lambda attr, value: attr < value,
-	"$gt": lambda attr, value: attr > value,
-	"$le": lambda attr, value: attr >= value,
-	"$ge": lambda attr, value: attr <= value,
-	"$in": lambda attr, value: attr.in_(value),
-	"$re": lambda attr, value: attr.regexp_match(value)
+	"$eq": operator.eq,
+	"$lt": operator.lt,
+	"$gt": operator.gt,
+	"$le": operator.le,
+	"$ge": operator.ge,
+	"$in": _in,
+	"$re": _regexp_match
 }
 
+LOGICAL_OPERATORS = {
+	"$and": sqlalchemy.and_,
+	"$or": sqlalchemy.or_,
+	"$not": sqlalchemy.not_
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _get_searchable_columns(
+	model: heiwa.database.Base
+) -> typing.Dict[str, sqlalchemy.orm.attributes.InstrumentedAttribute]:
+	"""Returns a mapping of ``model``'s column attributes' names to the attributes
+	themselves. Since the models never change at runtime, this is only done once
+	per model.
+
+	:param model: The model.
+
+	:returns: The mapping.
+	"""
+
+	return {
+		column_attr.key: getattr(model, column_attr.key)
+		for column_attr in sqlalchemy.inspect(model).column_attrs
+	}
+
+
+def _flatten_children(
+	operator_: str,
+	children: typing.List[
+		typing.Dict[
+			str,
+			typing.Union[
+				typing.Dict,
+				typing.Any
+			]
+		]
+	]
+) -> typing.List[
+	typing.Dict[
+		str,
+		typing.Union[
+			typing.Dict,
+			typing.Any
+		]
+	]
+]:
+	"""Splices the children of any direct descendants of an ``'$and'`` or
+	``'$or'`` condition using the same operator into its own children, keeping
+	their order. For example, ``{"$and": [A, {"$and": [B, C]}]}`` becomes
+	``{"$and": [A, B, C]}``. This keeps the resulting expression shallow, which
+	makes it quicker to compile.
+
+	:param operator_: The operator, either ``'$and'`` or ``'$or'``.
+	:param children: The condition's children.
+
+	:returns: The flattened children.
+	"""
+
+	result = []
+	pending = list(reversed(children))
+
+	while len(pending) != 0:
+		child = pending.pop()
+
+		if operator_ in child:
+			pending.extend(reversed(child[operator_]))
+
+			continue
+
+		result.append(child)
+
+	return result
+
 
 def parse_search(
 	conditions: typing.Dict[
@@ -52,33 +156,58 @@ def parse_search(
 	.. code-block:: sql
 
 		post_count > 1000 AND (user_id = UUID_HERE OR user_id = UUID_HERE)
+
+	:raises heiwa.exceptions.APIJSONInvalid: Raised when one of the conditions
+		refers to an attribute that is not a column of ``model``.
 	"""
 
-	operator = next(iter(conditions))
-
-	if operator == "$and":
-		return sqlalchemy.and_(
-			parse_search(condition, model)
-			for condition in conditions[operator]
-		)
-
-	if operator == "$or":
-		return sqlalchemy.or_(
-			parse_search(condition, model)
-			for condition in conditions[operator]
-		)
-
-	if operator == "$not":
-		return sqlalchemy.not_(
-			parse_search(
-				conditions[operator],
-				model
+	columns = _get_searchable_columns(model)
+
+	# Nested conditions are walked iteratively, since they are user input and
+	# can be arbitrarily deep. Each logical operator's clause is built once all
+	# of its children have been, in the order they were given in.
+
+	stack = [(conditions, None)]
+	results = []
+
+	while len(stack) != 0:
+		node, child_count = stack.pop()
+
+		operator_, value = next(iter(node.items()))
+
+		if operator_ not in LOGICAL_OPERATORS:
+			attr, attr_value = next(iter(value.items()))
+
+			if attr not in columns:
+				raise heiwa.exceptions.APIJSONInvalid({attr: ["unknown field"]})
+
+			results.append(
+				OPERATORS[operator_](
+					columns[attr],
+					attr_value
+				)
 			)
-		)
 
-	attr = next(iter(conditions[operator]))
+			continue
+
+		if child_count is None:
+			children = (
+				_flatten_children(operator_, value)
+				if operator_ != "$not"
+				else [value]
+			)
+
+			stack.append((node, len(children)))
+			stack.extend(
+				(child, None)
+				for child in reversed(children)
+			)
+
+			continue
+
+		parsed_children = results[-child_count:]
+		del results[-child_count:]
+
+		results.append(LOGICAL_OPERATORS[operator_](*parsed_children))
 
-	return OPERATORS[operator](
-		getattr(model, attr),
-		conditions[operator][attr]
-	)
+	return results[0]
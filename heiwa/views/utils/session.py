@@ -0,0 +1,26 @@
+import sqlalchemy.orm
+
+__all__ = ["commit_without_expiring"]
+
+
+def commit_without_expiring(session: sqlalchemy.orm.Session) -> None:
+	"""Commits the given ``session``, without expiring the objects within it.
+	Normally, every attribute accessed after a commit is loaded again from the
+	database, which is wasteful when the object is only going to be returned
+	in the response, and all of its values are already known.
+
+	:param session: The session to commit.
+
+	.. warning::
+		Only use this when none of the committed objects' columns could have been
+		changed by the database itself, e.g. by server-side defaults or triggers.
+		Otherwise, stale values will be returned.
+	"""
+
+	expire_on_commit = session.expire_on_commit
+	session.expire_on_commit = False
+
+	try:
+		session.commit()
+	finally:
+		session.expire_on_commit = expire_on_commit